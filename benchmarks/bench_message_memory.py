@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory footprint and export speed of a large message log.
+
+Builds a log of slotted Message records and, for comparison, of the
+previous plain-dataclass layout (per-instance __dict__, sender strings not
+interned), then measures bytes per message with tracemalloc and the time
+to export the log to dicts and JSON.
+
+Usage:
+    python benchmarks/bench_message_memory.py [--messages 1000000]
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.teamalpha.agent import AgentRole, Message, messages_to_dicts, messages_to_json
+
+SENDERS = ["Alice", "Bob", "Charlie", "Diana", "Eve", "SYSTEM"]
+ROLES = list(AgentRole)
+
+
+@dataclass
+class DictMessage:
+    """The pre-slots Message layout."""
+
+    sender: str
+    role: AgentRole
+    content: str
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self):
+        return {
+            "sender": self.sender,
+            "role": self.role.value,
+            "content": self.content,
+            "timestamp": self.timestamp,
+        }
+
+
+# A handful of distinct bodies, as in broadcast-heavy runs where the same
+# system notifications repeat; the benchmark measures per-record overhead.
+CONTENTS = [f"Task {i} assigned" for i in range(16)]
+
+
+def build(cls, n: int) -> list:
+    # "".join builds a fresh sender string per message, as parsing JSON or
+    # formatting f-strings would, so interning is what deduplicates them.
+    return [
+        cls(
+            "".join(SENDERS[i % len(SENDERS)]),
+            ROLES[i % len(ROLES)],
+            CONTENTS[i % len(CONTENTS)],
+        )
+        for i in range(n)
+    ]
+
+
+def measure(cls, n: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    log = build(cls, n)
+    build_s = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return log, size, build_s
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Message log memory benchmark")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+    n = args.messages
+
+    results = {}
+    old_log, old_size, old_build = measure(DictMessage, n)
+    results["dataclass"] = {
+        "bytes_per_message": old_size / n,
+        "build_s": old_build,
+        "to_dict_s": timed(lambda: [m.to_dict() for m in old_log]),
+        "json_s": timed(lambda: json.dumps([m.to_dict() for m in old_log])),
+    }
+    del old_log
+
+    new_log, new_size, new_build = measure(Message, n)
+    results["slots"] = {
+        "bytes_per_message": new_size / n,
+        "build_s": new_build,
+        "to_dict_s": timed(lambda: messages_to_dicts(new_log)),
+        "json_s": timed(lambda: messages_to_json(new_log)),
+    }
+
+    if args.json:
+        print(json.dumps({"messages": n, "results": results}, indent=2))
+        return
+    print(f"{n:,} messages")
+    print(f"{'layout':<12}{'bytes/msg':>12}{'build (s)':>12}{'to_dict (s)':>14}{'json (s)':>12}")
+    for name, r in results.items():
+        print(
+            f"{name:<12}{r['bytes_per_message']:>12.1f}{r['build_s']:>12.3f}"
+            f"{r['to_dict_s']:>14.3f}{r['json_s']:>12.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
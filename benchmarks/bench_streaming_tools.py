@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: streaming tool dispatch vs. post-hoc tool-call parsing.
+
+A simulated backend emits a response at a fixed token rate. The response
+requests a few slow, parallel-safe tools early on and then keeps writing.
+Post-hoc parsing waits for the whole generation before starting the tools;
+streaming dispatch starts each tool as soon as its call is complete.
+
+Usage:
+    python benchmarks/bench_streaming_tools.py [--tps 50] [--tool-latency 0.5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.teamalpha.agent import Agent, AgentRole, Tool
+
+
+class SimulatedLLM:
+    """Backend stand-in that generates a fixed response at a token rate."""
+
+    def __init__(self, text: str, tokens_per_second: float):
+        # ~4 characters per token, like the approximate tokenizer.
+        self.chunks = [text[i:i + 4] for i in range(0, len(text), 4)]
+        self.delay = 1.0 / tokens_per_second
+
+    def stream(self, prompt: str):
+        for chunk in self.chunks:
+            time.sleep(self.delay)
+            yield chunk
+
+    def invoke(self, prompt: str) -> str:
+        return "".join(self.stream(prompt))
+
+
+def make_response(n_calls: int, tail_tokens: int) -> str:
+    calls = "\n".join(
+        f'[TOOL: analyze, ARGS: {{"path": "/repos/service-{i}", "opts": {{"depth": 2}}}}]'
+        for i in range(n_calls)
+    )
+    return f"I will analyze each repository.\n{calls}\n" + "Reasoning. " * (tail_tokens // 3)
+
+
+def build_agent(llm, stream_tools: bool, tool_latency: float) -> Agent:
+    original = Agent._init_llm
+    Agent._init_llm = lambda self, *args: llm
+    try:
+        agent = Agent("Bench", AgentRole.ENGINEER, stream_tools=stream_tools)
+    finally:
+        Agent._init_llm = original
+
+    def analyze(path: str, opts: dict) -> str:
+        time.sleep(tool_latency)
+        return f"analyzed {path}"
+
+    agent.add_tool(
+        Tool("analyze", "Analyze a repository", analyze, parallel_safe=True)
+    )
+    return agent
+
+
+def run(mode_streaming: bool, args) -> float:
+    llm = SimulatedLLM(make_response(args.calls, args.tail_tokens), args.tps)
+    agent = build_agent(llm, mode_streaming, args.tool_latency)
+    started = time.perf_counter()
+    result = agent.execute("Analyze the service repositories")
+    elapsed = time.perf_counter() - started
+    assert result.count("[Tool Result (analyze)]") == args.calls, result
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tps", type=float, default=50.0, help="Simulated tokens/second")
+    parser.add_argument("--tool-latency", type=float, default=0.5, help="Seconds per tool call")
+    parser.add_argument("--calls", type=int, default=3, help="Tool calls per response")
+    parser.add_argument("--tail-tokens", type=int, default=60, help="Tokens after the last call")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = {}
+    for name, streaming in (("post_hoc", False), ("streaming", True)):
+        times = [run(streaming, args) for _ in range(args.repeat)]
+        results[name] = {"median_s": statistics.median(times), "runs": times}
+    speedup = results["post_hoc"]["median_s"] / results["streaming"]["median_s"]
+
+    if args.json:
+        print(json.dumps({"results": results, "speedup": speedup}, indent=2))
+        return
+    print(f"{'mode':<12}{'median (s)':>12}")
+    for name, data in results.items():
+        print(f"{name:<12}{data['median_s']:>12.3f}")
+    print(f"\nspeedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the agent/team hot paths.
+
+Runs against the replay backend (agents) and the in-process fake server
+(TeamAlphaClient), so no inference hardware is needed and results are
+comparable between runs and commits.
+
+Usage:
+    python benchmarks/bench_suite.py --output base.json
+    python benchmarks/bench_suite.py --output new.json --compare base.json
+    python benchmarks/bench_suite.py --compare base.json new.json   # no run
+    python benchmarks/bench_suite.py --filter team_ --quick
+
+--compare exits with status 1 when a benchmark's throughput drops by more
+than --threshold (default 10%).
+
+Round-trip benchmarks declare a ceiling on the cost of one operation
+against the zero-latency fake server. A run whose fastest sample is above
+it is dominated by a fixed delay (e.g. Nagle's algorithm against delayed
+ACKs, ~40 ms) rather than by our code; it is flagged as suspect instead
+of being trusted as a baseline.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], None]]] = {}
+# Benchmark name -> microseconds per op above which the result is suspect
+CEILINGS: Dict[str, float] = {}
+
+
+def bench(name: str, ceiling_us: Optional[float] = None):
+    """
+    Register a benchmark; the decorated setup returns the timed callable.
+
+    Args:
+        name: Benchmark name
+        ceiling_us: Cost per op that a healthy run stays under; exceeding
+            it means a fixed delay dominates the measurement
+    """
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        if ceiling_us is not None:
+            CEILINGS[name] = ceiling_us
+        return setup
+
+    return register
+
+
+def measure(func: Callable[[], None], repeat: int, min_time: float) -> Dict[str, float]:
+    """Time func, calibrating the loop count so each sample lasts min_time."""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed < min_time / 4 else 1 + int(min_time / max(elapsed, 1e-9))
+
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    median = statistics.median(samples)
+    return {
+        "ops_per_s": 1.0 / median if median else float("inf"),
+        "median_us": median * 1e6,
+        "min_us": min(samples) * 1e6,
+        "stdev_us": statistics.stdev(samples) * 1e6 if len(samples) > 1 else 0.0,
+        "loops": number,
+    }
+
+
+# -- fixtures ----------------------------------------------------------------
+
+_RECORDING: Optional[str] = None
+
+
+def replay_backend():
+    """Point Agent._init_llm at a small replay recording (instant responses)."""
+    global _RECORDING
+    if _RECORDING is None:
+        fd, _RECORDING = tempfile.mkstemp(suffix=".jsonl", prefix="bench_replay_")
+        atexit.register(os.unlink, _RECORDING)
+        with os.fdopen(fd, "w") as fh:
+            for i in range(4):
+                fh.write(json.dumps({
+                    "key": f"bench-{i}",
+                    "model": "bench",
+                    "completion": f"Step {i}: reviewed the change. FINAL ANSWER: done",
+                    "latency": 0.5,
+                }) + "\n")
+    os.environ["LLM_PROVIDER"] = "replay"
+    os.environ["LLM_REPLAY_FILE"] = _RECORDING
+    os.environ["LLM_REPLAY_SPEED"] = "0"
+
+
+def make_agent(name: str = "Bench", role=None, memories: int = 0):
+    from src.teamalpha.agent import Agent, AgentRole, Message, Tool
+
+    replay_backend()
+    agent = Agent(name, role or AgentRole.ENGINEER)
+    for i in range(5):
+        agent.add_tool(Tool(f"tool_{i}", f"Benchmark tool {i}", lambda **kw: "ok", ["path"]))
+    for i in range(memories):
+        agent.add_memory(Message(
+            sender=f"Agent{i % 7}",
+            role=AgentRole.ENGINEER,
+            content=f"Update {i}: finished reviewing module {i % 50} and fixed {i % 3} issues",
+        ))
+    return agent
+
+
+def make_team(agents: int, tasks: int = 0):
+    from src.teamalpha.agent import AgentRole
+    from src.teamalpha.team import Team
+
+    roles = list(AgentRole)
+    team = Team("Bench")
+    for i in range(agents):
+        team.add_agent(make_agent(f"Agent{i}", roles[i % len(roles)]))
+    for i in range(tasks):
+        task = team.create_task(f"task-{i}", f"Review module {i}")
+        task.assigned_to = f"Agent{i % max(agents, 1)}"
+        task.status = "completed" if i % 2 else "assigned"
+        task.result = "Looks good. " * 20
+    return team
+
+
+def large_response(calls: int, filler: int) -> str:
+    parts = []
+    for i in range(calls):
+        parts.append("Thinking about the next step. " * filler)
+        parts.append(
+            f'[TOOL: tool_{i % 5}, ARGS: {{"path": "/repos/service-{i}", "opts": {{"depth": {i}}}}}]'
+        )
+    return "\n".join(parts)
+
+
+# -- benchmarks --------------------------------------------------------------
+
+@bench("agent_build_system_prompt")
+def _():
+    agent = make_agent(memories=200)
+    return lambda: agent.build_system_prompt("Review the deployment pipeline changes")
+
+
+@bench("agent_parse_tool_calls_large")
+def _():
+    agent = make_agent()
+    text = large_response(calls=50, filler=40)
+    return lambda: agent.parse_tool_calls(text)
+
+
+@bench("agent_execute_replay")
+def _():
+    agent = make_agent(memories=50)
+    return lambda: agent.execute("Review the deployment pipeline changes")
+
+
+@bench("team_broadcast_message_50_agents")
+def _():
+    from src.teamalpha.agent import AgentRole, Message
+
+    team = make_team(agents=50)
+    message = Message(sender="SYSTEM", role=AgentRole.PM, content="Standup in five minutes")
+    return lambda: team.broadcast_message(message)
+
+
+@bench("team_status_report_1000_tasks")
+def _():
+    team = make_team(agents=10, tasks=1000)
+    return team.get_status_report
+
+
+@bench("tool_executor_extract_tool_calls")
+def _():
+    from tools.mcp_executor_agent import ToolExecutor
+
+    executor = ToolExecutor()
+    text = "\n".join(
+        "Let me look at this. " * 20
+        + f'github_get_readme("owner{i}", "repo{i}") fs_read_file("docs/file{i}.md")'
+        for i in range(50)
+    )
+    return lambda: executor.extract_tool_calls(text)
+
+
+@bench("client_round_trip", ceiling_us=20_000)
+def _():
+    from src.teamalpha.client import TeamAlphaClient
+    from tools.fake_llm_server import LatencyModel, make_server
+
+    server = make_server("127.0.0.1", 0, LatencyModel(ttft=0.0, tps=0.0, tokens=16, concurrency=8))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = TeamAlphaClient(base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    return lambda: client.generate("ping", max_tokens=16)
+
+
+# -- comparison --------------------------------------------------------------
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Print a comparison table and return the names of regressed benchmarks."""
+    regressions = []
+    print(f"{'benchmark':<36}{'base ops/s':>14}{'new ops/s':>14}{'change':>10}")
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<36}{'-':>14}{new['ops_per_s']:>14.1f}{'new':>10}")
+            continue
+        change = new["ops_per_s"] / old["ops_per_s"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "  ❌"
+        if old.get("suspect") or new.get("suspect"):
+            flag += "  ⚠️ fixed delay"
+        print(f"{name:<36}{old['ops_per_s']:>14.1f}{new['ops_per_s']:>14.1f}{change:>+10.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for agent/team hot paths")
+    parser.add_argument("--filter", default="", help="Only run benchmarks containing this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.1, help="Seconds per sample")
+    parser.add_argument("--quick", action="store_true", help="--repeat 3 --min-time 0.02")
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--json", action="store_true", help="Print results JSON")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="Baseline JSON (compared to this run), or baseline and current JSON")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Allowed relative throughput drop before failing")
+    parser.add_argument("--list", action="store_true", help="List benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    if args.compare and len(args.compare) == 2:
+        baseline, current = (json.loads(Path(p).read_text()) for p in args.compare)
+        return 1 if compare(baseline, current, args.threshold) else 0
+
+    if args.quick:
+        args.repeat, args.min_time = 3, 0.02
+
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        try:
+            results[name] = measure(setup(), args.repeat, args.min_time)
+        except ImportError as e:
+            print(f"⚠️  Skipping {name}: {e}", file=sys.stderr)
+            continue
+        r = results[name]
+        ceiling = CEILINGS.get(name)
+        if ceiling is not None and r["min_us"] > ceiling:
+            r["suspect"] = True
+            print(
+                f"⚠️  {name}: fastest sample {r['min_us']:.0f} µs exceeds {ceiling:.0f} µs; "
+                "dominated by a fixed delay, not comparable",
+                file=sys.stderr,
+            )
+        if not args.json:
+            print(f"{name:<36}{r['ops_per_s']:>14.1f} ops/s{r['median_us']:>12.1f} µs")
+
+    report = {
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if args.compare:
+        baseline = json.loads(Path(args.compare[0]).read_text())
+        print()
+        return 1 if compare(baseline, report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the teamalpha modules.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and reports its cumulative import time and heaviest dependencies. Two
+budgets apply per module:
+
+    time       cumulative milliseconds (best of --repeat runs), scaled by
+               --scale for slow machines
+    forbidden  heavy backend packages (LangChain, pydantic, httpx, NumPy)
+               that must only load on first use of a provider
+
+Usage:
+    python benchmarks/import_time.py                 # report
+    python benchmarks/import_time.py --check         # exit 1 on a budget miss
+    python benchmarks/import_time.py --check --scale 2 --json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ("langchain", "langchain_core", "langchain_ollama", "pydantic", "httpx", "numpy")
+
+# module -> (budget in ms, packages it must not import)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "src.teamalpha.client": (250.0, HEAVY),
+    "src.teamalpha.lmstudio": (300.0, HEAVY),
+    "src.teamalpha.model_registry": (250.0, HEAVY),
+    "src.teamalpha.agent": (150.0, HEAVY),
+    "src.teamalpha.team": (200.0, HEAVY),
+    "src.teamalpha.replay": (50.0, HEAVY),
+    "src.teamalpha.tracing": (50.0, HEAVY),
+}
+
+
+def import_profile(module: str) -> List[Tuple[str, int, float]]:
+    """
+    Import a module in a fresh interpreter.
+
+    Returns:
+        (module name, nesting depth, cumulative ms) for the module and
+        everything its import pulled in, in -X importtime order (children
+        before their parent); interpreter start-up imports are left out
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        p for p in (str(ROOT), os.environ.get("PYTHONPATH")) if p
+    ))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise ImportError(proc.stderr.strip().splitlines()[-1])
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(cumulative_us) / 1000))
+    # The target is the last top-level entry; its subtree directly precedes it.
+    end = max(i for i, (name, depth, _) in enumerate(rows) if depth == 0 and name == module)
+    start = end
+    while start > 0 and rows[start - 1][1] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def measure(module: str, repeat: int) -> Dict[str, object]:
+    """Best-of-repeat cumulative import time, heaviest deps and loaded packages."""
+    best = None
+    for _ in range(repeat):
+        rows = import_profile(module)
+        if best is None or rows[-1][2] < best[-1][2]:
+            best = rows
+    total = best[-1][2]
+    loaded = {name.split(".", 1)[0] for name, _, _ in best}
+    heaviest = sorted(
+        ((name, cum) for name, depth, cum in best if depth == 1),
+        key=lambda item: -item[1],
+    )[:5]
+    return {
+        "ms": round(total, 1),
+        "heaviest": [[name, round(cum, 1)] for name, cum in heaviest],
+        "loaded": sorted(loaded),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time budgets for teamalpha modules")
+    parser.add_argument("modules", nargs="*", help="Modules to measure (default: all budgeted)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module (best is kept)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply time budgets by this")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any budget is exceeded")
+    parser.add_argument("--json", action="store_true", help="Print results JSON")
+    args = parser.parse_args()
+
+    failures = []
+    results = {}
+    for module in args.modules or BUDGETS:
+        budget, forbidden = BUDGETS.get(module, (float("inf"), HEAVY))
+        budget *= args.scale
+        try:
+            result = measure(module, args.repeat)
+        except ImportError as e:
+            print(f"⚠️  Skipping {module}: {e}", file=sys.stderr)
+            continue
+        heavy = sorted(set(forbidden) & set(result.pop("loaded")))
+        result.update(budget_ms=budget, heavy=heavy)
+        results[module] = result
+        if result["ms"] > budget:
+            failures.append(f"{module}: {result['ms']:.1f} ms > {budget:.0f} ms budget")
+        if heavy:
+            failures.append(f"{module}: imports {', '.join(heavy)} eagerly")
+        if not args.json:
+            status = "✅" if result["ms"] <= budget and not heavy else "❌"
+            deps = ", ".join(f"{name} {ms:.0f}" for name, ms in result["heaviest"][:3])
+            print(f"{status} {module:<32}{result['ms']:>8.1f} ms  (budget {budget:.0f})  {deps}")
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}, indent=2))
+    elif failures:
+        print("\n" + "\n".join(f"❌ {f}" for f in failures))
+    return 1 if args.check and failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
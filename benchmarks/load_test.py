@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Load-generation harness for the LLM serving stack.
+
+Fires concurrent requests at one layer and reports throughput, errors and
+latency percentiles (plus time to first token for streaming targets):
+
+    proxy    TeamAlphaClient -> server.py POST /generate
+    ollama   POST /api/generate (Ollama API)
+    openai   LMStudioClient.generate / generate_stream (/v1/completions)
+
+Point it at tools/fake_llm_server.py to load-test offline, or pass --fake
+to start one in-process. With --fake the harness knows the server's
+latency model and warns when the median request took well over the
+modelled time: a fixed per-request delay (e.g. Nagle's algorithm against
+delayed ACKs) that would otherwise skew every percentile.
+
+Usage:
+    python benchmarks/load_test.py --target proxy --url http://localhost:8080 -c 16 -n 200
+    python benchmarks/load_test.py --fake --target openai --stream --json
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PROMPT = "Summarize the state of the deployment pipeline in two sentences."
+
+# Unexplained overhead on the median request above which --fake runs warn
+# (or OVERHEAD_RATIO of the modelled latency, if larger: per-token sleeps
+# in the fake server overshoot a little)
+FIXED_DELAY_MS = 30.0
+OVERHEAD_RATIO = 0.2
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Linearly interpolated percentile (p in 0..100) of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values) * 1000 if values else 0.0,
+    }
+
+
+def make_caller(args) -> Callable[[], Tuple[Optional[float], int]]:
+    """
+    Build a function that performs one request.
+
+    The returned callable gives (time to first chunk or None, response
+    length in characters). Each worker thread gets its own client.
+    """
+    local = threading.local()
+
+    if args.target == "proxy":
+        from src.teamalpha.client import TeamAlphaClient
+
+        def call():
+            if not hasattr(local, "client"):
+                local.client = TeamAlphaClient(base_url=args.url)
+            return None, len(local.client.generate(PROMPT, max_tokens=args.max_tokens))
+
+    elif args.target == "ollama":
+        import requests
+
+        def call():
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            payload = {
+                "model": args.model or "llama3",
+                "prompt": PROMPT,
+                "stream": args.stream,
+                "options": {"num_predict": args.max_tokens},
+            }
+            started = time.perf_counter()
+            with local.session.post(
+                f"{args.url}/api/generate", json=payload, stream=args.stream, timeout=args.timeout
+            ) as response:
+                response.raise_for_status()
+                if not args.stream:
+                    return None, len(response.json().get("response", ""))
+                first, size = None, 0
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line).get("response", "")
+                    if chunk and first is None:
+                        first = time.perf_counter() - started
+                    size += len(chunk)
+                return first, size
+
+    elif args.target == "openai":
+        from src.teamalpha.lmstudio import LMStudioClient
+
+        model = args.model or "openai/gpt-oss-20b"
+
+        def call():
+            if not hasattr(local, "client"):
+                local.client = LMStudioClient(base_url=args.url)
+            if not args.stream:
+                text = local.client.generate(
+                    PROMPT, model=model, max_tokens=args.max_tokens, timeout=args.timeout
+                )
+                return None, len(text)
+            started = time.perf_counter()
+            first, size = None, 0
+            for chunk in local.client.generate_stream(
+                PROMPT, model=model, max_tokens=args.max_tokens, timeout=args.timeout
+            ):
+                if first is None:
+                    first = time.perf_counter() - started
+                size += len(chunk)
+            return first, size
+
+    else:
+        raise ValueError(f"Unknown target: {args.target}")
+
+    return call
+
+
+def run_load(args) -> Dict:
+    """Run the load test and return the report."""
+    call = make_caller(args)
+    latencies: List[float] = []
+    ttfts: List[float] = []
+    errors: Dict[str, int] = {}
+    chars = 0
+    lock = threading.Lock()
+    issued = 0
+    deadline = time.perf_counter() + args.duration if args.duration else None
+
+    def next_ticket() -> bool:
+        nonlocal issued
+        with lock:
+            if deadline is not None:
+                return time.perf_counter() < deadline
+            if issued >= args.requests:
+                return False
+            issued += 1
+            return True
+
+    def worker():
+        nonlocal chars
+        while next_ticket():
+            started = time.perf_counter()
+            try:
+                first, size = call()
+            except Exception as e:
+                with lock:
+                    name = type(e).__name__
+                    errors[name] = errors.get(name, 0) + 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                chars += size
+                if first is not None:
+                    ttfts.append(first)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    report = {
+        "target": args.target,
+        "url": args.url,
+        "concurrency": args.concurrency,
+        "stream": args.stream,
+        "max_tokens": args.max_tokens,
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_s": wall,
+        "throughput_rps": len(latencies) / wall if wall else 0.0,
+        "chars_per_s": chars / wall if wall else 0.0,
+        "latency": summarize(latencies),
+    }
+    if ttfts:
+        report["ttft"] = summarize(ttfts)
+    return report
+
+
+def check_fixed_delay(report: Dict, model) -> Optional[str]:
+    """
+    Compare the median request with the fake server's latency model.
+
+    Streaming runs compare time to first token (per-chunk overhead makes
+    the total grow with length), others the full latency. Skipped when
+    the load exceeds the server's slots, since queueing then adds delay
+    legitimately.
+
+    Args:
+        report: Result of run_load
+        model: The fake server's LatencyModel
+
+    Returns:
+        A warning if the median request exceeded the modelled latency by
+        more than the allowed overhead, else None
+    """
+    if not report["ok"] or report["concurrency"] > model.concurrency:
+        return None
+    name = "ttft" if "ttft" in report else "latency"
+    expected_ms = 1000 * model.ttft * (1 - model.jitter)
+    if name == "latency" and model.tps > 0:
+        expected_ms += 1000 * (min(model.tokens, report["max_tokens"]) - 1) / model.tps
+    measured_ms = report[name]["p50_ms"]
+    overhead_ms = measured_ms - expected_ms
+    if overhead_ms <= max(FIXED_DELAY_MS, OVERHEAD_RATIO * expected_ms):
+        return None
+    return (
+        f"median {name} {measured_ms:.1f} ms vs {expected_ms:.1f} ms modelled; "
+        f"results are dominated by a fixed ~{overhead_ms:.0f} ms delay"
+    )
+
+
+def print_report(report: Dict):
+    print(f"🎯 {report['target']} @ {report['url']}  (concurrency {report['concurrency']})")
+    failed = sum(report["errors"].values())
+    print(f"   requests: {report['ok']} ok, {failed} failed {report['errors'] or ''}")
+    print(f"   throughput: {report['throughput_rps']:.2f} req/s, {report['chars_per_s']:.0f} chars/s")
+    if report.get("warning"):
+        print(f"   ⚠️  {report['warning']}")
+    for name in ("latency", "ttft"):
+        if name in report:
+            stats = report[name]
+            print(
+                f"   {name:<8} p50 {stats['p50_ms']:8.1f} ms  p90 {stats['p90_ms']:8.1f}  "
+                f"p95 {stats['p95_ms']:8.1f}  p99 {stats['p99_ms']:8.1f}  max {stats['max_ms']:8.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the LLM serving stack")
+    parser.add_argument("--target", choices=("proxy", "ollama", "openai"), default="proxy")
+    parser.add_argument("--url", default="http://localhost:8080", help="Base URL of the target")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=100, help="Total requests")
+    parser.add_argument("--duration", type=float, default=None, help="Run for N seconds instead of -n")
+    parser.add_argument("--stream", action="store_true", help="Stream responses and measure TTFT")
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--timeout", type=int, default=120)
+    parser.add_argument("--fake", action="store_true", help="Start tools/fake_llm_server.py in-process")
+    parser.add_argument("--fake-ttft", type=float, default=0.05)
+    parser.add_argument("--fake-tps", type=float, default=200.0)
+    parser.add_argument("--fake-concurrency", type=int, default=8)
+    parser.add_argument("--fake-error-rate", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    server = None
+    if args.fake:
+        from tools.fake_llm_server import LatencyModel, make_server
+
+        server = make_server("127.0.0.1", 0, LatencyModel(
+            ttft=args.fake_ttft,
+            tps=args.fake_tps,
+            concurrency=args.fake_concurrency,
+            error_rate=args.fake_error_rate,
+        ))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        args.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        report = run_load(args)
+    finally:
+        if server is not None:
+            server.shutdown()
+    if server is not None:
+        warning = check_fixed_delay(report, server.RequestHandlerClass.backend.model)
+        if warning:
+            report["warning"] = warning
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ import types
 # instantiated without installing the real dependency during this local run.
 mod = types.ModuleType("langchain_ollama")
 class OllamaLLM:
-    def __init__(self, model="llama3", base_url="http://ollama:11434"):
+    def __init__(self, model="llama3", base_url="http://ollama:11434", **kwargs):
         self.model = model
         self.base_url = base_url
     def invoke(self, prompt: str):
@@ -25,7 +25,9 @@ mod.OllamaLLM = OllamaLLM
 sys.modules["langchain_ollama"] = mod
 
 from src.teamalpha.team import Team
+from src.teamalpha.store import SQLiteStateStore
 from src.teamalpha.agent import Agent, AgentRole, Tool, Message
+from src.teamalpha.tool_cache import ToolResultCache, git_head_key
 import workflow_analyzer as wa
 import time
 import os
@@ -66,7 +68,10 @@ def make_agent(name: str, role: AgentRole) -> Agent:
 
 def main():
     target = "/home/clay/Projects/TheAgame"
-    team = Team("TeamAlpha-Prod")
+    # Checkpoint the run so a crash doesn't throw away finished work.
+    # Re-run with TEAMALPHA_RESUME=<run id> to continue where it stopped.
+    team = Team("TeamAlpha-Prod", store=SQLiteStateStore("teamalpha_state.db"))
+    resume_id = os.getenv("TEAMALPHA_RESUME")
 
     # Create agents
     eng = make_agent("Alice", AgentRole.ENGINEER)
@@ -84,6 +89,9 @@ def main():
         description="Run repository workflow analysis and produce recommendations",
         func=lambda path: workflow_tool(path),
         required_args=["path"],
+        # The analysis shells out to git dozens of times; reuse it until the
+        # repository moves to a new commit.
+        cache=ToolResultCache(maxsize=32, ttl=3600, invalidation_key=git_head_key("path")),
     )
 
     arch.add_tool(wf_tool)
@@ -95,9 +103,14 @@ def main():
     for a in (arch, eng):
         a.llm.invoke = lambda prompt, _tool_call=tool_call: _tool_call
 
-    # Create and assign task
-    task = team.create_task("prod-analysis-1", f"Analyze repository at {target}")
-    team.assign_task(task.id, "Eve")
+    # Create and assign task (or pick it up from the stored run)
+    if resume_id:
+        team.resume(resume_id)
+        task = team.tasks["prod-analysis-1"]
+    else:
+        task = team.create_task("prod-analysis-1", f"Analyze repository at {target}")
+        team.assign_task(task.id, "Eve")
+    print(f"Run id: {team.run_id}")
 
     # Execute the task
     print("Starting execution of workflow analysis task...")
@@ -13,6 +13,7 @@ import sys
 sys.path.insert(0, '/home/clay/Development/teamAlpha')
 
 from src.teamalpha.client import TeamAlphaClient
+from src.teamalpha.prompt import PromptBuilder, PromptSection
 
 
 def get_git_info(repo_path: str) -> dict:
@@ -245,25 +246,34 @@ def main():
         print("=" * 80)
         print()
         
-        analysis_prompt = f"""You are a DevOps/SRE expert analyzing a production deployment.
-
-GIT STATUS:
-{json.dumps(git_info, indent=2)[:500]}
-
-DATA DIRECTORIES:
-{json.dumps(data_info, indent=2)[:800]}
-
-DEPLOYMENT CONFIG:
-{json.dumps({k: v for k, v in deploy_info.items() if k.startswith('docker-compose')}, indent=2)[:600]}
-
-Provide a brief production health assessment covering:
+        compose_info = {k: v for k, v in deploy_info.items() if k.startswith('docker-compose')}
+        builder = PromptBuilder(context_window=4096, reserve_tokens=512)
+        built = builder.build([
+            PromptSection(
+                "role",
+                "You are a DevOps/SRE expert analyzing a production deployment.",
+                required=True,
+            ),
+            PromptSection("git", f"GIT STATUS:\n{json.dumps(git_info, indent=2)}", priority=1),
+            PromptSection("data", f"DATA DIRECTORIES:\n{json.dumps(data_info, indent=2)}", priority=3),
+            PromptSection("deploy", f"DEPLOYMENT CONFIG:\n{json.dumps(compose_info, indent=2)}", priority=2),
+            PromptSection(
+                "instructions",
+                """Provide a brief production health assessment covering:
 1. Deployment freshness (how recent is the commit?)
 2. Data volume assessment (normal/abnormal sizes?)
 3. Deployment strategy (docker-compose.yml vs docker-compose.prod.yml)
 4. Health indicators (anything concerning in the config?)
 5. Recommendations for monitoring/logging
 
-Keep it concise (6-8 sentences)."""
+Keep it concise (6-8 sentences).""",
+                required=True,
+            ),
+        ])
+        analysis_prompt = built.text
+        if built.truncated or built.dropped:
+            print(f"✂️  Prompt trimmed to {built.tokens}/{built.budget} tokens "
+                  f"(truncated: {built.truncated or '-'}, dropped: {built.dropped or '-'})")
 
         try:
             print("📤 Sending production state to LLM...\n")
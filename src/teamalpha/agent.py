@@ -1,19 +1,96 @@
 #!/usr/bin/env python3
 """Base agent class and role definitions for the software team."""
 
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
 from dataclasses import dataclass, field
 from enum import Enum
+import inspect
 import json
 import os
+import sys
+import time
+import uuid
+import warnings
 
-# Try to import LangChain Ollama, fall back gracefully
+from . import tracing
+from .best_of import DEFAULT_ACCEPT_SCORE, Candidate, Scorer, default_scorer, sample_parallel
+from .cascade import CascadePolicy, get_cascade_stats
+from .memory_index import MemoryIndex
+from .prompt import (
+    BuiltPrompt,
+    DEFAULT_CONTEXT_WINDOW,
+    PromptBuilder,
+    PromptSection,
+    truncate_to_tokens,
+)
+from .sandbox import ToolSandbox
+from .streaming import ToolCallStreamParser, dispatch_streaming, parse_tool_calls
+from .tool_cache import ToolResultCache
+
+# Optional faster JSON encoder for bulk message export
 try:
-    from langchain_ollama import OllamaLLM
-    OLLAMA_AVAILABLE = True
+    import orjson
 except ImportError:
-    OLLAMA_AVAILABLE = False
-    OllamaLLM = None
+    orjson = None
+
+# LangChain Ollama is imported on first use (it adds hundreds of
+# milliseconds to import time); None = not tried yet, False = missing.
+_ollama_llm = None
+
+
+def _load_ollama():
+    """langchain_ollama.OllamaLLM, or None if it is not installed."""
+    global _ollama_llm
+    if _ollama_llm is None:
+        try:
+            from langchain_ollama import OllamaLLM
+            _ollama_llm = OllamaLLM
+        except ImportError:
+            _ollama_llm = False
+    return _ollama_llm or None
+
+
+def __getattr__(name: str):
+    # OLLAMA_AVAILABLE and OllamaLLM used to be set at import time.
+    if name == "OLLAMA_AVAILABLE":
+        return _load_ollama() is not None
+    if name == "OllamaLLM":
+        return _load_ollama()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _config_source():
+    """Shared LLM config source (llm_config needs pydantic, so load lazily)."""
+    from .llm_config import get_config_source
+    return get_config_source()
+
+
+def _unsupported(error: Exception) -> bool:
+    """
+    Whether a backend error means the request itself is unsupported.
+
+    Only then is it worth permanently falling back to a simpler API; 5xx,
+    429 and other transient failures are re-raised instead (see
+    lmstudio.LMStudioHTTPError).
+    """
+    return bool(getattr(error, "unsupported", False))
+
+
+def _tools_unsupported(error: Exception) -> bool:
+    """
+    Whether a backend error means structured tool calls are unsupported.
+
+    A missing chat endpoint (404) qualifies; a 400/422 only if the server's
+    message mentions tools, since a bad prompt or parameter says nothing
+    about tool support.
+    """
+    if not _unsupported(error):
+        return False
+    if getattr(error, "status_code", None) == 404:
+        return True
+    detail = f"{error} {getattr(error, 'body', '')}".lower()
+    return "tool" in detail or "function" in detail
 
 
 class AgentRole(Enum):
@@ -26,41 +103,174 @@ class AgentRole(Enum):
     PM = "product_manager"
 
 
-@dataclass
+_ROLE_VALUES = {role: role.value for role in AgentRole}
+
+# Token cap for one message in get_memory_summary
+_MEMORY_MESSAGE_TOKENS = 50
+
+# Providers Agent knows how to build (llm_config also allows "custom")
+_PROVIDERS = ("auto", "ollama", "lmstudio", "record", "replay")
+
+
+@dataclass(slots=True)
 class Message:
-    """A message in the team communication."""
+    """
+    A message in the team communication.
+
+    Slotted (no per-instance __dict__) with interned sender names, since a
+    long run keeps every message in the team log and in each agent's memory.
+    """
 
     sender: str
     role: AgentRole
     content: str
-    timestamp: float = field(default_factory=lambda: __import__("time").time())
+    timestamp: float = field(default_factory=time.time)
+
+    def __post_init__(self):
+        self.sender = sys.intern(self.sender)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dict."""
         return {
             "sender": self.sender,
-            "role": self.role.value,
+            "role": _ROLE_VALUES[self.role],
             "content": self.content,
             "timestamp": self.timestamp,
         }
 
 
+def messages_to_dicts(messages: List[Message]) -> List[Dict[str, Any]]:
+    """Convert many messages to dicts (faster than calling to_dict in a loop)."""
+    roles = _ROLE_VALUES
+    return [
+        {
+            "sender": m.sender,
+            "role": roles[m.role],
+            "content": m.content,
+            "timestamp": m.timestamp,
+        }
+        for m in messages
+    ]
+
+
+def messages_to_json(messages: List[Message]) -> bytes:
+    """Serialize messages to a JSON array (uses orjson when installed)."""
+    dicts = messages_to_dicts(messages)
+    if orjson is not None:
+        return orjson.dumps(dicts)
+    return json.dumps(dicts, separators=(",", ":")).encode()
+
+
 @dataclass
 class Tool:
     """A tool available to agents."""
 
+    _JSON_TYPES = {
+        str: "string",
+        int: "integer",
+        float: "number",
+        bool: "boolean",
+        list: "array",
+        dict: "object",
+    }
+
     name: str
     description: str
     func: Callable
     required_args: List[str] = field(default_factory=list)
+    # Read-only tools may run concurrently with other parallel-safe calls;
+    # side-effecting tools (the default) run alone, in call order.
+    parallel_safe: bool = False
+    # Seconds, enforced by Agent.run_tool_calls. In-process tools are only
+    # abandoned on timeout (threads cannot be killed); attach a sandbox to
+    # have the call actually stopped.
+    timeout: Optional[float] = None
+    cache: Optional[ToolResultCache] = None  # opt-in memoization
+    # Run in a worker process with timeouts/rlimits instead of in-process.
+    sandbox: Optional[ToolSandbox] = None
 
-    def invoke(self, **kwargs) -> str:
-        """Invoke the tool."""
+    def to_schema(self) -> Dict[str, Any]:
+        """
+        Describe the tool as an OpenAI function definition (JSON schema).
+
+        Parameters come from the function signature where possible, with
+        types taken from annotations (default "string"); required_args are
+        always listed as required.
+        """
+        properties: Dict[str, Any] = {}
+        required = list(self.required_args)
         try:
-            result = self.func(**kwargs)
-            return json.dumps({"success": True, "result": result})
-        except Exception as e:
-            return json.dumps({"success": False, "error": str(e)})
+            params = inspect.signature(self.func).parameters.values()
+        except (TypeError, ValueError):
+            params = []
+        for param in params:
+            if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            properties[param.name] = {
+                "type": self._JSON_TYPES.get(param.annotation, "string")
+            }
+            if param.default is param.empty and param.name not in required:
+                required.append(param.name)
+        for name in self.required_args:
+            properties.setdefault(name, {"type": "string"})
+
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": properties,
+                    "required": required,
+                },
+            },
+        }
+
+    def invoke(self, **kwargs) -> str:
+        """
+        Invoke the tool.
+
+        With a cache attached, successful results are memoized and the
+        returned JSON carries ``"cached": true/false``. With a sandbox
+        attached, the function runs in a worker process and is killed if
+        it exceeds the tool's timeout.
+        """
+        with tracing.span("tool.invoke", tool=self.name, sandboxed=self.sandbox is not None) as span:
+            if self.cache is not None:
+                hit, result, version = self.cache.lookup(self.name, kwargs)
+                span.set(cache_hit=hit)
+                if hit:
+                    return json.dumps({"success": True, "result": result, "cached": True})
+            try:
+                if self.sandbox is not None:
+                    result = self.sandbox.run(self.func, kwargs, timeout=self.timeout)
+                else:
+                    result = self.func(**kwargs)
+            except Exception as e:
+                span.set(success=False)
+                return json.dumps({"success": False, "error": str(e)})
+            if self.cache is None:
+                return json.dumps({"success": True, "result": result})
+            self.cache.put(self.name, kwargs, result, version=version)
+            return json.dumps({"success": True, "result": result, "cached": False})
+
+
+@dataclass
+class StepRecord:
+    """Timing and size of one think/act step of Agent.execute."""
+
+    step: int
+    prompt_tokens: int
+    output_tokens: int
+    llm_seconds: float
+    tool_seconds: float = 0.0
+    tool_calls: int = 0
+    final: bool = False
+
+
+# Marker the model uses to end a multi-step tool loop.
+FINAL_ANSWER = "FINAL ANSWER:"
 
 
 class Agent:
@@ -73,7 +283,24 @@ class Agent:
         llm_model: str = "llama3",
         ollama_host: str = "http://ollama:11434",
         lmstudio_host: str = "http://localhost:1234",
-        provider: str = "auto",  # "auto", "ollama", "lmstudio"
+        provider: str = "auto",  # "auto", "ollama", "lmstudio", "record", "replay"
+        memory_token_budget: int = 512,
+        context_window: int = DEFAULT_CONTEXT_WINDOW,
+        tokenizer=None,
+        keep_alive: str = "30m",
+        max_tool_workers: int = 4,
+        max_steps: int = 1,
+        step_token_budget: Optional[int] = None,
+        native_tools: bool = True,
+        stream_tools: bool = False,
+        chat_mode: bool = True,
+        semantic_cache=None,
+        cascade_model: Optional[str] = None,
+        cascade_policy: Optional[CascadePolicy] = None,
+        best_of: int = 1,
+        scorer: Optional[Scorer] = None,
+        accept_score: Optional[float] = DEFAULT_ACCEPT_SCORE,
+        temperature: Optional[float] = None,
     ):
         """
         Initialize an agent.
@@ -84,15 +311,90 @@ class Agent:
             llm_model: LLM model name
             ollama_host: Ollama server URL
             lmstudio_host: LM Studio server URL
-            provider: LLM provider ("auto" auto-detects, "ollama", "lmstudio")
+            provider: LLM provider ("auto" auto-detects, "ollama", "lmstudio",
+                "record" wraps the real backend, "replay" serves a recording).
+                LLM_PROVIDER overrides it; the LLM config file's provider
+                applies only to "auto"
+            memory_token_budget: Token budget for the memory section of the
+                system prompt
+            context_window: Model context window in tokens
+            tokenizer: Token counter (object with count(text), or an encode
+                function); defaults to a fast character-based estimate
+            keep_alive: How long Ollama keeps the model (and its KV cache)
+                loaded between calls
+            max_tool_workers: Size of the thread pool for tool calls
+            max_steps: Think/act iterations per execute() call; with more
+                than one, tool results are fed back to the model
+            step_token_budget: Total prompt + output tokens execute() may
+                spend across steps (None = unlimited)
+            native_tools: Use the backend's structured tool calling when it
+                has one, instead of parsing [TOOL: ...] from text
+            stream_tools: On the text path, stream the response and start
+                parallel-safe tools as soon as their call is complete.
+                Streamed steps skip the semantic cache and cascade
+                escalation, since their tools are already running before
+                the answer can be checked
+            chat_mode: With a chat-capable backend, send the stable prompt
+                prefix as the system message and the rest as the user
+                message instead of one flat completion prompt
+            semantic_cache: Optional SemanticCache consulted by think();
+                near-duplicate prompts reuse an earlier completion
+            cascade_model: Larger model to escalate to when an answer from
+                llm_model fails the cascade checks (None = the role's
+                cascade_model from the LLM config, if any)
+            cascade_policy: Checks deciding when to escalate
+            best_of: Samples per execute() step; the best-scoring one is
+                used (see best_of.py)
+            scorer: Scores a sampled response (default: best_of.default_scorer)
+            accept_score: With parallel sampling, the first candidate
+                scoring at least this cancels the rest (None = wait for all)
+            temperature: Sampling temperature for LM Studio requests (None =
+                the client's default); LangChain LLMs use their own setting
         """
         self.name = name
         self.role = role
-        self.llm = self._init_llm(
-            llm_model, ollama_host, lmstudio_host, provider
-        )
+        self.keep_alive = keep_alive
+        self.temperature = temperature
+        # Lets the backend route repeated calls to the same cached prefix.
+        self.session_id = f"{name}-{uuid.uuid4().hex[:8]}"
+        self._prefix: Optional[str] = None
+        self._prefix_tokens = 0
+        self._llm_args = (llm_model, ollama_host, lmstudio_host, provider)
+        source = _config_source()
+        source.get()  # load before reading the version reload_llm compares
+        self._config_version = source.version
+        self.llm = self._init_llm(*self._llm_args)
+        self._built_llm = self.llm
         self.tools: Dict[str, Tool] = {}
-        self.memory: List[Message] = []
+        self._memory: List[Message] = []
+        self._memory_loader: Optional[Callable[[], List[Message]]] = None
+        self.memory_index = MemoryIndex()
+        self.memory_token_budget = memory_token_budget
+        self.prompt_builder = PromptBuilder(
+            context_window=context_window, tokenizer=tokenizer
+        )
+        self.last_prompt: Optional[BuiltPrompt] = None
+        self.max_tool_workers = max_tool_workers
+        self._tool_pool: Optional[ThreadPoolExecutor] = None
+        self.max_steps = max_steps
+        self.step_token_budget = step_token_budget
+        self.last_steps: List[StepRecord] = []
+        self.native_tools = native_tools
+        self.stream_tools = stream_tools
+        self.chat_mode = chat_mode
+        self.semantic_cache = semantic_cache
+        self.cascade_model = cascade_model
+        self.cascade_policy = cascade_policy or CascadePolicy()
+        # Why the last answer was escalated (None = small model sufficed)
+        self.last_escalation: Optional[str] = None
+        self._escalation_llm: Optional[Tuple[int, str, Any]] = None
+        self.best_of = best_of
+        self.scorer = scorer
+        self.accept_score = accept_score
+        # Candidates scored by the last think_best_of() call
+        self.last_candidates: List[Candidate] = []
+        # Server-reported token usage of the last chat call, if any
+        self.last_usage: Dict[str, int] = {}
         self.context = ""
         self.provider = provider
 
@@ -102,44 +404,130 @@ class Agent:
         ollama_host: str,
         lmstudio_host: str,
         provider: str,
+        use_env: bool = True,
+        model_override: Optional[str] = None,
     ):
-        """Initialize LLM with provider auto-detection."""
+        """
+        Initialize LLM with provider auto-detection.
+
+        With ``use_env``, the LLM_PROVIDER variable overrides ``provider``
+        (so record/replay can be switched on for a whole run). The shared
+        LLM config (llm_config.get_config_source) picks the provider only
+        when ``provider`` is "auto", and supplies the role's model override
+        and endpoint lists, weighted by share. A provider from the
+        environment or config that Agent cannot build (e.g. "custom") is
+        ignored with a warning. ``model_override`` replaces the model for
+        every provider.
+        """
+        from .llm_config import Endpoint
+        from .model_registry import get_registry
         
         # Check environment for provider override
-        env_provider = os.getenv("LLM_PROVIDER", provider)
-        env_lmstudio_host = os.getenv("LMSTUDIO_HOST", lmstudio_host)
+        env_provider = os.getenv("LLM_PROVIDER", provider) if use_env else provider
+        settings = _config_source().get() if use_env else None
+        override = settings.role_override(self.role) if settings else None
+        if settings is not None and provider == "auto":
+            configured = override.provider
+            if configured is None and "LLM_PROVIDER" not in os.environ:
+                configured = settings.configured_provider()
+            if configured is not None:
+                env_provider = configured.value
+        if env_provider not in _PROVIDERS and env_provider != provider:
+            print(f"⚠️  Ignoring unsupported LLM provider {env_provider!r}; using {provider!r}")
+            env_provider = provider
+        if settings is None:
+            lmstudio_endpoints = [Endpoint(url=lmstudio_host)]
+            ollama_endpoints = [Endpoint(url=ollama_host)]
+            lmstudio_model = "openai/gpt-oss-20b"
+        else:
+            lmstudio_endpoints = settings.lmstudio.endpoints or [Endpoint(url=lmstudio_host)]
+            ollama_endpoints = settings.ollama.endpoints or [Endpoint(url=ollama_host)]
+            lmstudio_model = settings.lmstudio.model
+            if override.endpoints:
+                if env_provider == "ollama":
+                    ollama_endpoints = override.endpoints
+                else:
+                    lmstudio_endpoints = override.endpoints
+            if override.model:
+                model = lmstudio_model = override.model
+        if model_override:
+            model = lmstudio_model = model_override
+        lmstudio_hosts = [e.url for e in lmstudio_endpoints]
+        lmstudio_weights = {e.url: e.weight for e in lmstudio_endpoints}
+        registry = get_registry()
+        if len(ollama_endpoints) > 1:
+            ollama_host = registry.route(
+                model,
+                [e.url for e in ollama_endpoints],
+                kind="ollama",
+                weights={e.url: e.weight for e in ollama_endpoints},
+            ) or ollama_endpoints[0].url
+        else:
+            ollama_host = ollama_endpoints[0].url
         
-        if env_provider == "lmstudio":
-            # Use LM Studio
+        if env_provider == "replay":
+            # Serve recorded completions, no inference server needed
+            from .replay import get_replay_llm
+            return get_replay_llm(
+                os.getenv("LLM_REPLAY_FILE", "llm_recording.jsonl"),
+                speed=float(os.getenv("LLM_REPLAY_SPEED", "0")),
+                strict=os.getenv("LLM_REPLAY_STRICT", "") == "1",
+            )
+
+        elif env_provider == "record":
+            # Record prompt -> completion pairs from the real backend
+            from .replay import RecordingLLM
+            inner = self._init_llm(
+                model,
+                ollama_host,
+                lmstudio_host,
+                os.getenv("LLM_RECORD_PROVIDER", "auto"),
+                use_env=False,
+                model_override=model_override,
+            )
+            return RecordingLLM(
+                inner,
+                os.getenv("LLM_RECORD_FILE", "llm_recording.jsonl"),
+                model=model,
+            )
+
+        elif env_provider == "lmstudio":
+            # Use LM Studio, preferring a server that has the model loaded
             from .lmstudio import LMStudioClient
-            return LMStudioClient(base_url=env_lmstudio_host)
+            host = registry.route(
+                lmstudio_model, lmstudio_hosts, weights=lmstudio_weights
+            ) or lmstudio_hosts[0]
+            return LMStudioClient(base_url=host, default_model=lmstudio_model)
         
         elif env_provider == "ollama":
             # Use Ollama
-            if not OLLAMA_AVAILABLE:
+            OllamaLLM = _load_ollama()
+            if OllamaLLM is None:
                 raise ImportError("OllamaLLM not available. Install: pip install langchain-ollama")
-            return OllamaLLM(model=model, base_url=ollama_host)
+            return OllamaLLM(
+                model=model, base_url=ollama_host, keep_alive=self.keep_alive
+            )
         
         elif env_provider == "auto":
-            # Try LM Studio first, then Ollama
-            try:
-                from .lmstudio import LMStudioClient
-                client = LMStudioClient(base_url=env_lmstudio_host)
-                # Test connection
+            # Try LM Studio first, then Ollama. Health comes from the
+            # shared registry, so building many agents probes each server
+            # once per TTL instead of once per agent.
+            host = registry.route(lmstudio_model, lmstudio_hosts, weights=lmstudio_weights)
+            if host is not None:
                 try:
-                    health = client.health()
-                    if health.get("status") != "offline":
-                        print(f"✅ Using LM Studio at {env_lmstudio_host}")
-                        return client
-                except:
+                    from .lmstudio import LMStudioClient
+                    print(f"✅ Using LM Studio at {host}")
+                    return LMStudioClient(base_url=host, default_model=lmstudio_model)
+                except ImportError:
                     pass
-            except:
-                pass
             
             # Fall back to Ollama
-            if OLLAMA_AVAILABLE:
+            OllamaLLM = _load_ollama()
+            if OllamaLLM is not None:
                 print(f"✅ Using Ollama at {ollama_host}")
-                return OllamaLLM(model=model, base_url=ollama_host)
+                return OllamaLLM(
+                    model=model, base_url=ollama_host, keep_alive=self.keep_alive
+                )
             
             raise RuntimeError(
                 "No LLM provider available.\n"
@@ -151,111 +539,786 @@ class Agent:
             raise ValueError(f"Unknown provider: {env_provider}")
 
 
+    def reload_llm(self, force: bool = False) -> bool:
+        """
+        Rebuild the LLM if the shared LLM config changed since it was built.
+
+        Called before each think(), so edits to the config file or
+        environment reach running agents without a restart. An LLM that
+        was assigned to ``agent.llm`` from outside is kept unless ``force``.
+
+        Returns:
+            Whether the LLM was rebuilt
+        """
+        source = _config_source()
+        source.get()
+        if not force and (
+            source.version == self._config_version or self.llm is not self._built_llm
+        ):
+            return False
+        self._config_version = source.version
+        self.llm = self._built_llm = self._init_llm(*self._llm_args)
+        return True
+
+    @property
+    def context(self) -> str:
+        """Team context, part of the stable prompt prefix."""
+        return self._context
+
+    @context.setter
+    def context(self, value: str):
+        self._context = value
+        self.invalidate_prompt_cache()
+
+    def invalidate_prompt_cache(self):
+        """Drop the cached prompt prefix (after tools or context change)."""
+        self._prefix = None
+
     def add_tool(self, tool: Tool):
         """Register a tool."""
         self.tools[tool.name] = tool
+        self.invalidate_prompt_cache()
+
+    @property
+    def memory(self) -> List[Message]:
+        """Messages seen by this agent (loaded on first use after a resume)."""
+        self._load_pending_memory()
+        return self._memory
+
+    @memory.setter
+    def memory(self, messages: List[Message]):
+        self._memory_loader = None
+        self._memory = []
+        self.memory_index.clear()
+        for message in messages:
+            self._index_message(message)
+
+    def set_memory_loader(self, loader: Callable[[], List[Message]]):
+        """Defer loading memory until it is first needed (used by Team.resume)."""
+        self._memory = []
+        self.memory_index.clear()
+        self._memory_loader = loader
+
+    def _load_pending_memory(self):
+        if self._memory_loader is not None:
+            loader, self._memory_loader = self._memory_loader, None
+            for message in loader():
+                self._index_message(message)
+
+    def _index_message(self, message: Message):
+        self.memory_index.add(len(self._memory), f"{message.sender} {message.content}")
+        self._memory.append(message)
 
     def add_memory(self, message: Message):
         """Add a message to memory."""
-        self.memory.append(message)
-
-    def get_memory_summary(self, last_n: int = 10) -> str:
-        """Get a summary of recent messages."""
-        recent = self.memory[-last_n:]
-        summary = "\n".join(
-            [
-                f"[{m.sender} ({m.role.value})]: {m.content[:200]}"
-                for m in recent
-            ]
-        )
+        self._load_pending_memory()
+        self._index_message(message)
+
+    def get_memory_summary(
+        self,
+        last_n: int = 10,
+        query: Optional[str] = None,
+        token_budget: Optional[int] = None,
+    ) -> str:
+        """
+        Get a summary of messages from memory.
+
+        Args:
+            last_n: Maximum number of messages to include
+            query: If given, pick the messages most relevant to it instead
+                of the most recent ones
+            token_budget: Token cap for the summary (each message is also
+                cut to _MEMORY_MESSAGE_TOKENS tokens)
+
+        Returns:
+            Messages in chronological order, one per line
+        """
+        memory = self.memory
+        # Best-ranked first; newest first when nothing matches the query.
+        # The budget is spent in this order.
+        selected: List[int] = []
+        if query:
+            hits = self.memory_index.search(query, top_k=last_n)
+            selected = [doc_id for doc_id, _ in hits]
+        if not selected:
+            start = max(0, len(memory) - last_n)
+            selected = list(range(len(memory) - 1, start - 1, -1))
+
+        lines: Dict[int, str] = {}
+        used = 0
+        for idx in selected:
+            m = memory[idx]
+            content = truncate_to_tokens(
+                m.content, _MEMORY_MESSAGE_TOKENS, self.prompt_builder.tokenizer
+            )
+            line = f"[{m.sender} ({m.role.value})]: {content}"
+            cost = self.prompt_builder.count(line)
+            if token_budget is not None and used + cost > token_budget:
+                continue
+            lines[idx] = line
+            used += cost
+
+        summary = "\n".join(lines[idx] for idx in sorted(lines))
         return summary or "No messages yet."
 
-    def build_system_prompt(self) -> str:
-        """Build the system prompt for this agent."""
-        tools_desc = "\n".join(
-            [f"- {t.name}: {t.description}" for t in self.tools.values()]
-        )
-        return f"""You are {self.name}, a {self.role.value} in a software team.
+    def build_stable_prefix(self) -> str:
+        """
+        Render the part of the prompt that does not change between calls.
+
+        Identity, role, tools and team context come first so that every call
+        from this agent shares the same prefix and the backend can reuse its
+        KV cache for it. The rendered text is cached until tools or context
+        change.
+        """
+        if self._prefix is None:
+            tools_desc = "\n".join(
+                [f"- {t.name}: {t.description}" for t in self.tools.values()]
+            )
+            parts = [
+                f"""You are {self.name}, a {self.role.value} in a software team.
 
 Your responsibilities:
 - Produce clear, concise work aligned with your role
 - Use tools when necessary
-- Communicate decisions and blockers to the team
+- Communicate decisions and blockers to the team""",
+                f"Available tools:\n{tools_desc or 'None yet'}",
+            ]
+            if self.context:
+                parts.append(self.context)
+            self._prefix = "\n\n".join(parts)
+            self._prefix_tokens = self.prompt_builder.count(self._prefix)
+        return self._prefix
 
-Available tools:
-{tools_desc or "None yet"}
+    def _prompt_sections(self, task: Optional[str] = None) -> List[PromptSection]:
+        """Stable prefix followed by the volatile sections."""
+        prefix = self.build_stable_prefix()
+        memory = self.get_memory_summary(
+            query=task, token_budget=self.memory_token_budget
+        )
+        return [
+            PromptSection(
+                "prefix", prefix, required=True, tokens=self._prefix_tokens
+            ),
+            PromptSection("memory", f"Recent team memory:\n{memory}", priority=1),
+        ]
 
-Recent team memory:
-{self.get_memory_summary()}
+    def build_system_prompt(self, task: Optional[str] = None) -> str:
+        """
+        Build the system prompt for this agent.
 
-{self.context}
-"""
+        Args:
+            task: Current task; when given, memory is retrieved by relevance
+                to it rather than recency
+        """
+        return "\n\n".join(
+            s.text for s in self._prompt_sections(task) if s.text
+        )
 
-    def think(self, task: str) -> str:
+    def build_prompt(self, task: str, scratchpad: str = "") -> BuiltPrompt:
+        """
+        Assemble the full prompt for a task within the context window.
+
+        The stable prefix and the task are always kept; memory and the
+        scratchpad are truncated or dropped when the budget runs out. The
+        scratchpad loses its oldest steps first, so the latest tool
+        results always reach the model. The report is kept on
+        ``last_prompt``.
+
+        Args:
+            task: The task description
+            scratchpad: Earlier steps and tool results of a multi-step run;
+                placed last so each step extends the previous prompt
+
+        Returns:
+            BuiltPrompt with the prompt text and what was truncated/dropped
+        """
+        sections = self._prompt_sections(task)
+        task_text = f"Task: {task}"
+        if scratchpad:
+            # The instructions ride with the task so that truncating the
+            # scratchpad from the start cannot cut them off.
+            task_text += (
+                "\n\nWork so far (use more tools if needed, or reply with "
+                f"'{FINAL_ANSWER} ...' when done):"
+            )
+        sections.append(PromptSection("task", task_text, required=True))
+        if scratchpad:
+            sections.append(
+                PromptSection("scratchpad", scratchpad, priority=2, keep_tail=True)
+            )
+        with tracing.span("agent.build_prompt", agent=self.name) as span:
+            self.last_prompt = self.prompt_builder.build(sections)
+            if span:
+                span.set(
+                    prompt_tokens=self.last_prompt.tokens,
+                    truncated=list(self.last_prompt.truncated),
+                    dropped=list(self.last_prompt.dropped),
+                )
+        return self.last_prompt
+
+    def think(self, task: str, scratchpad: str = "") -> str:
         """
         Invoke the LLM to think about a task.
 
         Args:
             task: The task description
+            scratchpad: Earlier steps of a multi-step run
 
         Returns:
             LLM response
         """
-        prompt = f"{self.build_system_prompt()}\n\nTask: {task}"
-        
-        # Handle both LangChain LLM and custom LM Studio client
-        if hasattr(self.llm, 'invoke'):
+        self.reload_llm()
+        with tracing.span("agent.think", agent=self.name):
+            built = self.build_prompt(task, scratchpad)
+            if self.semantic_cache is not None:
+                return self.semantic_cache.cached_call(
+                    built.text,
+                    lambda: self._cascade(lambda llm: self._think_uncached(built, llm)),
+                    model=self._model_key(),
+                    temperature=self.sampling_temperature(),
+                )
+            return self._cascade(lambda llm: self._think_uncached(built, llm))
+
+    def _think_uncached(self, built: BuiltPrompt, llm=None) -> str:
+        llm = self.llm if llm is None else llm
+        if self.chat_mode and hasattr(llm, "chat"):
+            try:
+                return self._chat(built, llm)
+            except RuntimeError as e:
+                if not _unsupported(e):
+                    raise
+                print(f"⚠️  {self.name}: chat completions unavailable ({e}); using flat prompts")
+                self.chat_mode = False
+        return self._generate(built.text, llm)
+
+    def cascade_target(self) -> Optional[str]:
+        """Model answers escalate to, or None if cascade mode is off."""
+        if self.cascade_model:
+            return self.cascade_model
+        return _config_source().get().role_override(self.role).cascade_model
+
+    def _get_escalation_llm(self, target: str):
+        version = _config_source().version
+        cached = self._escalation_llm
+        if cached is None or cached[:2] != (version, target):
+            llm = self._init_llm(*self._llm_args, model_override=target)
+            self._escalation_llm = cached = (version, target, llm)
+        return cached[2]
+
+    def _cascade(self, call: Callable[[Any], Any]) -> Any:
+        """
+        Run ``call`` on the agent's model and, in cascade mode, again on the
+        larger model if the answer fails the policy checks.
+
+        ``call`` takes the LLM to use and returns the response text or a
+        (text, tool calls) tuple. The escalation LLM is passed in rather
+        than swapped into ``self.llm``, so concurrent calls on the agent
+        keep using the model they started with.
+        """
+        self.last_escalation = None
+        result = call(self.llm)
+        target = self.cascade_target()
+        if not target:
+            return result
+        text = result[0] if isinstance(result, tuple) else result
+        reason = self.cascade_policy.check(
+            text, self.parse_tool_calls, known_tools=self.tools or None
+        )
+        get_cascade_stats().record(_ROLE_VALUES[self.role], reason)
+        if reason is None:
+            return result
+        self.last_escalation = reason
+        with tracing.span("agent.escalate", agent=self.name, reason=reason, model=target):
+            return call(self._get_escalation_llm(target))
+
+    def _model_key(self) -> str:
+        """Backend and model name, for partitioning caches."""
+        model = (
+            getattr(self.llm, "default_model", None)
+            or getattr(self.llm, "model", None)
+            or getattr(self.llm, "model_name", None)
+        )
+        return f"{type(self.llm).__name__}:{model}"
+
+    def uses_chat(self) -> bool:
+        """Whether think() sends structured chat messages."""
+        return self.chat_mode and hasattr(self.llm, "chat")
+
+    def sampling_temperature(self) -> Optional[float]:
+        """Temperature think() samples at, or None if unknown."""
+        if hasattr(self.llm, "invoke"):
+            return getattr(self.llm, "temperature", None)
+        return self.temperature
+
+    def _sampling_kwargs(self) -> Dict[str, Any]:
+        """Sampling arguments for every LMStudioClient call (chat, generate, stream)."""
+        return {} if self.temperature is None else {"temperature": self.temperature}
+
+    def _chat(self, built: BuiltPrompt, llm=None, **kwargs) -> str:
+        """Send a built prompt as system + user messages; returns the text."""
+        return self._chat_reply(built, llm, **kwargs).content
+
+    def _chat_reply(self, built: BuiltPrompt, llm=None, **kwargs):
+        """Send a built prompt as system + user messages; returns the ChatResponse."""
+        llm = self.llm if llm is None else llm
+        with tracing.span("llm.chat", backend=type(llm).__name__) as span:
+            reply = llm.chat(
+                self._chat_messages(built),
+                session_id=self.session_id,
+                **{**self._sampling_kwargs(), **kwargs},
+            )
+            self.last_usage = reply.usage
+            if span:
+                span.set(
+                    prompt_tokens=reply.usage.get("prompt_tokens", built.tokens),
+                    output_tokens=reply.usage.get(
+                        "completion_tokens", self.prompt_builder.count(reply.content)
+                    ),
+                )
+            return reply
+
+    def _generate(self, prompt: str, llm=None) -> str:
+        """Send a flat prompt to whichever LLM interface is configured."""
+        llm = self.llm if llm is None else llm
+        with tracing.span("llm.generate", backend=type(llm).__name__) as span:
+            # Handle both LangChain LLM and custom LM Studio client
+            if hasattr(llm, 'invoke'):
+                # LangChain interface (Ollama)
+                response = llm.invoke(prompt)
+            elif hasattr(llm, 'generate'):
+                # Custom LM Studio client
+                response = llm.generate(
+                    prompt, session_id=self.session_id, **self._sampling_kwargs()
+                )
+            else:
+                raise RuntimeError(f"Unknown LLM interface: {type(llm)}")
+            if span:
+                span.set(
+                    prompt_tokens=self.last_prompt.tokens if self.last_prompt else None,
+                    output_tokens=self.prompt_builder.count(response),
+                )
+            return response
+
+    def _chat_messages(self, built: BuiltPrompt) -> List[Dict[str, str]]:
+        """
+        Split a built prompt into a system message and a user message.
+
+        The system message is only the cached stable prefix, so it is
+        byte-identical across calls; memory, task and scratchpad, which
+        change between calls, go into the user message.
+        """
+        sep = self.prompt_builder.separator
+        return [
+            {"role": "system", "content": built.sections.get("prefix", "")},
+            {
+                "role": "user",
+                "content": sep.join(
+                    text for name, text in built.sections.items() if name != "prefix"
+                ),
+            },
+        ]
+
+    def uses_native_tools(self) -> bool:
+        """Whether tool calls go through the backend's structured API."""
+        return self.native_tools and bool(self.tools) and hasattr(self.llm, "chat")
+
+    def think_with_tools(
+        self, task: str, scratchpad: str = ""
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Think about a task and return the response and its tool calls.
+
+        Uses structured tool calling (chat completions with JSON-schema
+        tool definitions) when the backend supports it and falls back to
+        parsing [TOOL: ...] calls out of the text otherwise. A backend
+        that rejects the tools request is switched to the text path.
+        With stream_tools, the text path streams and bypasses the
+        semantic cache and cascade escalation.
+
+        Args:
+            task: The task description
+            scratchpad: Earlier steps of a multi-step run
+
+        Returns:
+            (response text, tool calls in parse_tool_calls format)
+        """
+        self.reload_llm()
+        if self.uses_native_tools():
+            built = self.build_prompt(task, scratchpad)
+            try:
+                return self._cascade(lambda llm: self._think_native(built, llm))
+            except RuntimeError as e:
+                if not _tools_unsupported(e):
+                    raise
+                warnings.warn(
+                    f"{self.name}: structured tool calls unavailable ({e}); using text parser",
+                    RuntimeWarning,
+                    stacklevel=2,
+                )
+                self.native_tools = False
+
+        if self.stream_tools and self.can_stream():
+            return self._think_streaming(task, scratchpad)
+
+        response = self.think(task, scratchpad)
+        return response, self.parse_tool_calls(response)
+
+    def _think_native(
+        self, built: BuiltPrompt, llm=None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """One structured tool-calling round trip."""
+        llm = self.llm if llm is None else llm
+        with tracing.span("llm.chat", backend=type(llm).__name__) as span:
+            reply = llm.chat(
+                self._chat_messages(built),
+                tools=[t.to_schema() for t in self.tools.values()],
+                session_id=self.session_id,
+                **self._sampling_kwargs(),
+            )
+            self.last_usage = reply.usage
+            if span:
+                span.set(
+                    prompt_tokens=reply.usage.get("prompt_tokens", built.tokens),
+                    output_tokens=reply.usage.get(
+                        "completion_tokens", self.prompt_builder.count(reply.content)
+                    ),
+                    tool_calls=len(reply.tool_calls),
+                )
+        # Echo the calls in text form so transcripts read the same
+        # as on the text path.
+        response = reply.content + "".join(
+            f"\n[TOOL: {c['tool']}, ARGS: {json.dumps(c['args'])}]"
+            for c in reply.tool_calls
+        )
+        return response, reply.tool_calls
+
+    def can_stream(self) -> bool:
+        """Whether the backend can stream tokens."""
+        return hasattr(self.llm, "stream") or hasattr(self.llm, "generate_stream")
+
+    def _stream(self, prompt: str) -> Iterator[str]:
+        """Yield response chunks from the backend as they are generated."""
+        if hasattr(self.llm, "stream"):
             # LangChain interface (Ollama)
-            return self.llm.invoke(prompt)
-        elif hasattr(self.llm, 'generate'):
-            # Custom LM Studio client
-            return self.llm.generate(prompt)
+            yield from self.llm.stream(prompt)
         else:
-            raise RuntimeError(f"Unknown LLM interface: {type(self.llm)}")
+            yield from self.llm.generate_stream(
+                prompt, session_id=self.session_id, **self._sampling_kwargs()
+            )
 
-    def parse_tool_calls(self, response: str) -> List[Dict[str, Any]]:
+    def _think_streaming(
+        self, task: str, scratchpad: str = ""
+    ) -> Tuple[str, List[Dict[str, Any]]]:
         """
-        Parse tool calls from LLM response (simple regex-based parser).
+        Stream the response, dispatching tools while generation continues.
 
-        Expects format: [TOOL: tool_name, ARGS: {"key": "value"}]
+        Parallel-safe tools start on the tool pool as soon as their call is
+        complete; their futures ride along on the call dicts and are
+        collected by run_tool_calls. Side-effecting tools still run after
+        generation, in order. Not routed through the semantic cache or
+        cascade: tools are already running before the answer can be
+        checked.
         """
-        import re
+        prompt = self.build_prompt(task, scratchpad).text
 
-        tool_calls = []
-        pattern = r"\[TOOL:\s*(\w+),\s*ARGS:\s*({[^}]+})\]"
-        for match in re.finditer(pattern, response):
-            tool_name = match.group(1)
-            args_str = match.group(2)
-            try:
-                args = json.loads(args_str)
-                tool_calls.append({"tool": tool_name, "args": args})
-            except json.JSONDecodeError:
-                pass
+        def submit(call: Dict[str, Any]) -> Optional[Future]:
+            tool = self.tools.get(call["tool"])
+            if tool is None or not tool.parallel_safe:
+                return None
+            return self._get_tool_pool().submit(tracing.bind(tool.invoke), **call["args"])
+
+        with tracing.span("llm.stream", backend=type(self.llm).__name__) as span:
+            response, calls = dispatch_streaming(
+                self._stream(prompt), ToolCallStreamParser(), submit
+            )
+            if span:
+                span.set(
+                    prompt_tokens=self.last_prompt.tokens,
+                    output_tokens=self.prompt_builder.count(response),
+                    tool_calls=len(calls),
+                )
+            return response, calls
 
-        return tool_calls
+    def think_best_of(
+        self, task: str, scratchpad: str = "", n: Optional[int] = None
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Sample n responses and return the best-scoring one.
+
+        A chat backend is asked for all n in one request (OpenAI ``n``);
+        servers that return fewer choices are topped up, and other
+        backends sampled, with parallel requests, where the first
+        acceptable candidate cancels the rest. Tool calls are parsed from
+        the winning text, so structured tool calling is not used here.
+
+        Args:
+            task: The task description
+            scratchpad: Earlier steps of a multi-step run
+            n: Number of samples (default: the agent's best_of)
+
+        Returns:
+            (winning response, its tool calls)
+        """
+        self.reload_llm()
+        n = n or self.best_of
+        scorer = self.scorer or default_scorer
+        built = self.build_prompt(task, scratchpad)
+        candidates: List[Candidate] = []
+        cancelled = 0
+
+        with tracing.span("agent.best_of", agent=self.name, n=n) as span:
+            if self.uses_chat():
+                try:
+                    reply = self._chat_reply(built, n=n)
+                    candidates = [Candidate(t, scorer(t)) for t in reply.choices or [reply.content]]
+                except RuntimeError as e:
+                    if not _unsupported(e):
+                        raise
+                    print(f"⚠️  {self.name}: chat completions unavailable ({e}); using flat prompts")
+                    self.chat_mode = False
+            accepted = self.accept_score is not None and any(
+                c.score >= self.accept_score for c in candidates
+            )
+            if len(candidates) < n and not accepted:
+                more, cancelled = sample_parallel(
+                    lambda cancel: self._sample(built, cancel),
+                    n - len(candidates),
+                    scorer,
+                    self.accept_score,
+                )
+                candidates += more
+            best = max(candidates, key=lambda c: c.score)
+            if span:
+                span.set(candidates=len(candidates), cancelled=cancelled, score=best.score)
+
+        self.last_candidates = candidates
+        return best.text, self.parse_tool_calls(best.text)
+
+    def _sample(self, built: BuiltPrompt, cancel) -> Optional[str]:
+        """
+        One sample for think_best_of.
 
-    def execute(self, task: str) -> str:
+        Uses the same prompt format as think(): chat messages in chat mode,
+        otherwise a flat completion, streamed when possible so it can stop
+        early once another sample is accepted.
         """
-        Execute a task: think, parse tool calls, and return result.
+        if self.uses_chat() or not self.can_stream():
+            return None if cancel.is_set() else self._think_uncached(built)
+        chunks = []
+        stream = self._stream(built.text)
+        try:
+            for chunk in stream:
+                if cancel.is_set():
+                    return None
+                chunks.append(chunk)
+        finally:
+            # Closing the generator closes the HTTP response.
+            stream.close()
+        return "".join(chunks)
+
+    def parse_tool_calls(self, response: str) -> List[Dict[str, Any]]:
+        """
+        Parse tool calls from LLM response.
+
+        Expects format: [TOOL: tool_name, ARGS: {"key": "value"}]
+        ARGS may be any JSON object, including nested ones.
+        """
+        return parse_tool_calls(response)
+
+    def execute(
+        self,
+        task: str,
+        max_steps: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        best_of: Optional[int] = None,
+    ) -> str:
+        """
+        Execute a task: think, run tool calls, and return the result.
+
+        With max_steps > 1 this is a ReAct-style loop: tool results are fed
+        back to the model, which either calls more tools or answers with
+        FINAL ANSWER. The loop also ends early when a step makes no tool
+        calls or the token budget is spent. Tool results of the last step
+        are appended to its response, as in single-step mode. Per-step
+        timings are kept on ``last_steps``.
 
         Args:
             task: The task description
+            max_steps: Overrides the agent's max_steps
+            token_budget: Overrides the agent's step_token_budget
+            best_of: Overrides the agent's best_of; with more than one,
+                each step keeps the best of that many samples
 
         Returns:
             Execution result
         """
-        response = self.think(task)
-        tool_calls = self.parse_tool_calls(response)
+        max_steps = max_steps or self.max_steps
+        best_of = best_of or self.best_of
+        token_budget = token_budget or self.step_token_budget
+        self.last_steps = []
+        scratchpad = ""
+        spent = 0
+
+        with tracing.span("agent.execute", agent=self.name, max_steps=max_steps) as span:
+            for step in range(1, max_steps + 1):
+                started = time.perf_counter()
+                if best_of > 1:
+                    response, tool_calls = self.think_best_of(task, scratchpad, best_of)
+                else:
+                    response, tool_calls = self.think_with_tools(task, scratchpad)
+                record = StepRecord(
+                    step=step,
+                    prompt_tokens=self.last_prompt.tokens,
+                    output_tokens=self.prompt_builder.count(response),
+                    llm_seconds=time.perf_counter() - started,
+                )
+                self.last_steps.append(record)
+                spent += record.prompt_tokens + record.output_tokens
+                span.set(steps=step, tokens=spent)
+
+                answered = max_steps > 1 and FINAL_ANSWER in response
+                if answered or not tool_calls:
+                    record.final = True
+                    if answered:
+                        response = response.split(FINAL_ANSWER, 1)[1].strip()
+                    return response
+
+                started = time.perf_counter()
+                with tracing.span("agent.run_tools", calls=len(tool_calls)):
+                    results = self.run_tool_calls(tool_calls)
+                record.tool_seconds = time.perf_counter() - started
+                record.tool_calls = len(results)
+                observations = "".join(
+                    f"\n[Tool Result ({tool_name})]: {result}"
+                    for tool_name, result in results
+                )
+
+                out_of_budget = token_budget is not None and spent >= token_budget
+                if step == max_steps or out_of_budget:
+                    record.final = True
+                    return response + observations
+                scratchpad += f"\n[Step {step}]\n{response}{observations}\n"
+
+            return response
+
+    def run_tool_calls(
+        self, tool_calls: List[Dict[str, Any]]
+    ) -> List[Tuple[str, str]]:
+        """
+        Run parsed tool calls and collect their results.
+
+        Consecutive parallel-safe calls run concurrently on the agent's tool
+        pool; a side-effecting call waits for everything before it and runs
+        alone. Calls to unknown tools, like malformed calls, get an error
+        result so the model can correct itself.
+
+        Args:
+            tool_calls: Calls as returned by parse_tool_calls
+
+        Returns:
+            (tool_name, result_json) pairs in the order the calls were made
+        """
+        results: List[Tuple[str, str]] = []
+        batch: List[Dict[str, Any]] = []
+        for call in tool_calls:
+            error = call.get("error")
+            if call["tool"] not in self.tools:
+                error = (
+                    f"Unknown tool {call['tool']!r}; available: "
+                    f"{', '.join(sorted(self.tools)) or 'none'}"
+                )
+            if error is not None:
+                # Malformed or unknown call: report it back to the model.
+                results.extend(self._run_batch(batch))
+                results.append(
+                    (call["tool"], json.dumps({"success": False, "error": error}))
+                )
+                batch = []
+                continue
+            if self.tools[call["tool"]].parallel_safe:
+                batch.append(call)
+                continue
+            results.extend(self._run_batch(batch))
+            results.extend(self._run_batch([call]))
+            batch = []
+        results.extend(self._run_batch(batch))
+        return results
+
+    def close(self):
+        """
+        Shut down the tool pool.
+
+        Queued tool calls are cancelled. Calls already running finish in
+        the background; a hung in-process tool still keeps its thread (and
+        interpreter exit) waiting, so give such tools a sandbox.
+        """
+        pool, self._tool_pool = self._tool_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
+
+    def _get_tool_pool(self) -> ThreadPoolExecutor:
+        if self._tool_pool is None:
+            self._tool_pool = ThreadPoolExecutor(
+                max_workers=self.max_tool_workers,
+                thread_name_prefix=f"{self.name}-tool",
+            )
+        return self._tool_pool
 
-        if tool_calls:
-            for call in tool_calls:
-                tool_name = call["tool"]
-                args = call["args"]
-                if tool_name in self.tools:
-                    result = self.tools[tool_name].invoke(**args)
-                    response += f"\n[Tool Result ({tool_name})]: {result}"
+    def _run_batch(self, calls: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """
+        Run calls concurrently and return results in submission order.
+
+        A call that exceeds its tool's timeout is abandoned, not stopped:
+        its thread keeps running. So that it cannot tie up a worker for
+        later batches, the pool it runs on is retired and the next batch
+        gets a fresh one.
+        """
+        if not calls:
+            return []
+        call = calls[0]
+        if len(calls) == 1 and "future" not in call and self.tools[call["tool"]].timeout is None:
+            # Nothing to overlap or enforce; skip the pool hop.
+            return [(call["tool"], self.tools[call["tool"]].invoke(**call["args"]))]
+
+        started = time.monotonic()
+        # Calls dispatched during streaming are already running.
+        futures = [
+            c.get("future")
+            or self._get_tool_pool().submit(tracing.bind(self.tools[c["tool"]].invoke), **c["args"])
+            for c in calls
+        ]
+
+        results = []
+        for call, future in zip(calls, futures):
+            tool = self.tools[call["tool"]]
+            remaining = None
+            if tool.timeout is not None:
+                remaining = max(0.0, tool.timeout - (time.monotonic() - started))
+            try:
+                result = future.result(timeout=remaining)
+            except FutureTimeout:
+                if not future.cancel():
+                    self._retire_tool_pool()
+                result = json.dumps({
+                    "success": False,
+                    "error": f"Tool {tool.name} timed out after {tool.timeout}s",
+                })
+            results.append((call["tool"], result))
+        return results
 
-        return response
+    def _retire_tool_pool(self):
+        """Stop handing work to the current pool; calls already on it still finish."""
+        pool, self._tool_pool = self._tool_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
 
     def __repr__(self) -> str:
         return f"Agent({self.name}, {self.role.value})"
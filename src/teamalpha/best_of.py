@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Best-of-n sampling.
+
+Instead of re-running a poor answer by hand, an agent can draw n samples
+and keep the best one according to a scorer:
+
+    agent.execute(task, best_of=3)                       # default scorer
+    agent.execute(task, best_of=4)  # with Agent(..., scorer=my_score, accept_score=0.8)
+
+Samples come from one backend call where the server supports OpenAI's
+``n`` parameter, otherwise from n parallel requests. In parallel mode the
+first candidate scoring at least ``accept_score`` stops the others
+(streamed completions close their connection; chat-mode samples, which are
+not streamed, are skipped if they have not started), so a quality retry
+costs about one generation of latency instead of n.
+"""
+
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+import threading
+
+from . import tracing
+from .cascade import CascadePolicy
+from .streaming import parse_tool_calls
+
+Scorer = Callable[[str], float]
+
+# Score at or above which a candidate is good enough to stop sampling.
+# default_scorer gives every answer that passes its checks at least 0.5, so
+# accepting at 0.5 would stop at the first passing sample (best-of-1); 0.75
+# takes an early answer only if it is also substantial (~500+ characters).
+DEFAULT_ACCEPT_SCORE = 0.75
+
+_policy = CascadePolicy()
+
+
+def default_scorer(text: str) -> float:
+    """
+    Cheap quality score in [0, 1].
+
+    0 for answers that fail the cascade checks (too short, broken tool
+    call, low confidence); otherwise 0.5 rising to 1.0 with length up to
+    1000 characters.
+    """
+    if _policy.check(text, parse_tool_calls) is not None:
+        return 0.0
+    return 0.5 + 0.5 * min(1.0, len(text.strip()) / 1000)
+
+
+@dataclass
+class Candidate:
+    """One sampled answer and its score."""
+
+    text: str
+    score: float
+
+
+def sample_parallel(
+    sample: Callable[[threading.Event], Optional[str]],
+    n: int,
+    scorer: Scorer,
+    accept_score: Optional[float] = None,
+) -> Tuple[List[Candidate], int]:
+    """
+    Draw up to n samples concurrently.
+
+    Args:
+        sample: Produces one answer; should return None early once the
+            event is set (the answer is no longer needed)
+        n: Number of samples
+        scorer: Scores an answer
+        accept_score: Stop at the first candidate scoring at least this
+            (None = wait for all n)
+
+    Returns:
+        (scored candidates in completion order, samples cancelled)
+    """
+    cancel = threading.Event()
+    candidates: List[Candidate] = []
+    errors: List[Exception] = []
+    pool = ThreadPoolExecutor(max_workers=n, thread_name_prefix="best-of")
+    try:
+        futures = [pool.submit(tracing.bind(sample), cancel) for _ in range(n)]
+        for future in as_completed(futures):
+            try:
+                text = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            if text is None:
+                continue
+            candidate = Candidate(text, scorer(text))
+            candidates.append(candidate)
+            if accept_score is not None and candidate.score >= accept_score:
+                cancel.set()
+                break
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    if not candidates and errors:
+        raise errors[0]
+    return candidates, n - len(candidates) - len(errors)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Small-model-first cascade.
+
+An agent in cascade mode answers with its regular (small, fast) model and
+re-asks a larger model only when a cheap check on the answer fails:
+
+    short           no tool calls and fewer than ``min_chars`` characters
+    tool_parse      a [TOOL: ...] call that does not parse, or names a tool
+                    the agent does not have
+    low_confidence  the answer contains a hedge such as "I'm not sure" or
+                    "CONFIDENCE: LOW"
+
+    agent = Agent("Rita", AgentRole.REVIEWER, llm_model="qwen2.5:3b",
+                  cascade_model="llama3:70b")
+    ...
+    print(get_cascade_stats().rates())   # escalation rate per role
+
+The larger model can also be set per role in the LLM config
+(``roles.<role>.cascade_model``).
+"""
+
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+from collections import Counter
+from dataclasses import dataclass
+import threading
+
+
+@dataclass
+class CascadePolicy:
+    """When a small-model answer is escalated to the larger model."""
+
+    min_chars: int = 40
+    low_confidence_markers: Tuple[str, ...] = (
+        "confidence: low",
+        "i'm not sure",
+        "i am not sure",
+        "i'm not certain",
+        "i don't know",
+        "i do not know",
+        "unable to determine",
+        "cannot determine",
+    )
+
+    def check(
+        self,
+        response: str,
+        parse_tool_calls: Callable[[str], List[Dict[str, Any]]],
+        known_tools: Optional[Collection[str]] = None,
+    ) -> Optional[str]:
+        """
+        Run the cheap checks on a response.
+
+        Args:
+            response: Model output
+            parse_tool_calls: Parser for [TOOL: ...] calls
+            known_tools: Tool names the agent has (None = don't check names)
+
+        Returns:
+            Escalation reason ("short", "tool_parse", "low_confidence"), or
+            None if the answer can be used as is
+        """
+        calls = parse_tool_calls(response) if "[TOOL:" in response else []
+        if len(calls) < response.count("[TOOL:"):
+            return "tool_parse"
+        if known_tools is not None and any(c["tool"] not in known_tools for c in calls):
+            return "tool_parse"
+        if not calls and len(response.strip()) < self.min_chars:
+            return "short"
+        lowered = response.lower()
+        if any(marker in lowered for marker in self.low_confidence_markers):
+            return "low_confidence"
+        return None
+
+
+class CascadeStats:
+    """Thread-safe per-role counts of cascade calls and escalations."""
+
+    def __init__(self):
+        self._calls: Counter = Counter()
+        self._reasons: Dict[str, Counter] = {}
+        self._lock = threading.Lock()
+
+    def record(self, role: str, reason: Optional[str]):
+        """Count one small-model answer and, if escalated, why."""
+        with self._lock:
+            self._calls[role] += 1
+            if reason is not None:
+                self._reasons.setdefault(role, Counter())[reason] += 1
+
+    def rates(self) -> Dict[str, Dict[str, Any]]:
+        """Calls, escalations, escalation rate and reasons per role."""
+        with self._lock:
+            report = {}
+            for role, calls in self._calls.items():
+                reasons = self._reasons.get(role, Counter())
+                escalated = sum(reasons.values())
+                report[role] = {
+                    "calls": calls,
+                    "escalated": escalated,
+                    "rate": escalated / calls,
+                    "reasons": dict(reasons),
+                }
+            return report
+
+    def reset(self):
+        """Clear all counts."""
+        with self._lock:
+            self._calls.clear()
+            self._reasons.clear()
+
+
+_stats = CascadeStats()
+
+
+def get_cascade_stats() -> CascadeStats:
+    """Process-wide escalation statistics shared by all agents."""
+    return _stats
@@ -5,19 +5,33 @@ import requests
 from typing import Optional
 import json
 
+from . import tracing
+
 
 class TeamAlphaClient:
     """Client for interacting with the TeamAlpha LLM HTTP endpoint."""
 
-    def __init__(self, base_url: str = "http://localhost:8080"):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8080",
+        semantic_cache=None,
+        temperature: Optional[float] = None,
+    ):
         """
         Initialize the TeamAlpha client.
 
         Args:
             base_url: The base URL of the TeamAlpha server (default: http://localhost:8080)
+            semantic_cache: Optional SemanticCache; near-duplicate prompts
+                are answered from it instead of the server
+            temperature: Sampling temperature the server uses; the semantic
+                cache only answers when it is known (not None) and at most
+                the cache's max_temperature
         """
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
+        self.semantic_cache = semantic_cache
+        self.temperature = temperature
 
     def health(self) -> dict:
         """
@@ -51,14 +65,25 @@ class TeamAlphaClient:
             requests.RequestException: If the request fails.
             ValueError: If the response is invalid.
         """
+        if self.semantic_cache is not None:
+            return self.semantic_cache.cached_call(
+                prompt,
+                lambda: self._generate(prompt, max_tokens),
+                model=f"{self.base_url}|max_tokens={max_tokens}",
+                temperature=self.temperature,
+            )
+        return self._generate(prompt, max_tokens)
+
+    def _generate(self, prompt: str, max_tokens: Optional[int]) -> str:
         url = f"{self.base_url}/generate"
         payload = {"prompt": prompt}
         if max_tokens is not None:
             payload["max_tokens"] = max_tokens
 
-        response = self.session.post(url, json=payload)
-        response.raise_for_status()
-        data = response.json()
+        with tracing.span("client.generate", url=url):
+            response = self.session.post(url, json=payload)
+            response.raise_for_status()
+            data = response.json()
 
         if "text" not in data:
             raise ValueError(f"Invalid response: {data}")
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Embeddings client with batching, deduplication and a persistent vector cache.
+
+Talks to the OpenAI-compatible ``/v1/embeddings`` endpoint that both
+LM Studio and Ollama expose:
+
+    cache = VectorCache("embeddings_cache")
+    client = EmbeddingsClient("http://localhost:1234", "text-embedding-nomic-embed-text-v1.5", cache=cache)
+    vectors = client.embed(texts)          # unchanged texts come from the cache
+
+    index = VectorIndex()
+    index.add(ids, vectors)
+    index.search(client.embed_one("query"), top_k=5)
+
+Vectors are stored as float32. NumPy is optional: search uses it when
+installed and falls back to pure Python otherwise.
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+from array import array
+import hashlib
+import heapq
+import math
+import os
+import threading
+
+from . import tracing
+
+# Optional NumPy for vectorized similarity search
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+Vector = Sequence[float]
+
+
+def content_hash(text: str, model: str) -> str:
+    """Cache key for a text embedded with a given model."""
+    return hashlib.sha1(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class VectorCache:
+    """
+    Content-hash -> float32 vector store.
+
+    With a path, vectors are appended to ``<path>.f32`` (raw float32 rows)
+    and their keys to ``<path>.keys`` (one hex hash per line), so the cache
+    survives restarts and costs 4 bytes per dimension. Without a path it
+    lives in memory only.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) a cache.
+
+        Args:
+            path: File prefix for persistence (None = in-memory)
+        """
+        self.path = path
+        self.dim: Optional[int] = None
+        self._data = array("f")
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+
+    def _load(self):
+        keys_path, data_path = f"{self.path}.keys", f"{self.path}.f32"
+        if not (os.path.exists(keys_path) and os.path.exists(data_path)):
+            return
+        with open(keys_path, encoding="ascii") as fh:
+            lines = fh.readlines()
+        header = lines[0].split() if lines else []
+        if not header or header[0] != "dim":
+            return
+        self.dim = int(header[1])
+        # Only newline-terminated keys were written completely.
+        keys = [line.strip() for line in lines[1:] if line.endswith("\n") and line.strip()]
+        with open(data_path, "rb") as fh:
+            raw = fh.read()
+        row_bytes = self.dim * self._data.itemsize
+        # A crash between (or during) the two appends leaves one file ahead;
+        # trust only rows present in both, and cut the files back to them so
+        # later appends line up again.
+        rows = min(len(keys), len(raw) // row_bytes)
+        self._data.frombytes(raw[:rows * row_bytes])
+        self._rows = {key: i for i, key in enumerate(keys[:rows])}
+        if len(raw) != rows * row_bytes:
+            os.truncate(data_path, rows * row_bytes)
+        if len(lines) - 1 != rows:
+            tmp_path = f"{keys_path}.tmp"
+            with open(tmp_path, "w", encoding="ascii") as fh:
+                fh.write(f"dim {self.dim}\n")
+                fh.write("".join(f"{k}\n" for k in keys[:rows]))
+            os.replace(tmp_path, keys_path)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Vector for a key, or None."""
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return None
+            return self._data[row * self.dim:(row + 1) * self.dim].tolist()
+
+    def put_many(self, keys: List[str], vectors: List[Vector]):
+        """Store vectors (keys already present are skipped)."""
+        with self._lock:
+            new = [(k, v) for k, v in zip(keys, vectors) if k not in self._rows]
+            if not new:
+                return
+            if self.dim is None:
+                self.dim = len(new[0][1])
+            chunk = array("f")
+            for key, vector in new:
+                if len(vector) != self.dim:
+                    raise ValueError(f"Vector has {len(vector)} dimensions, cache has {self.dim}")
+                chunk.extend(vector)
+            start = len(self._rows)
+            self._data.extend(chunk)
+            for i, (key, _) in enumerate(new):
+                self._rows[key] = start + i
+            if self.path:
+                self._append(chunk, [k for k, _ in new])
+
+    def _append(self, chunk: array, keys: List[str]):
+        keys_path = f"{self.path}.keys"
+        if not os.path.exists(keys_path):
+            with open(keys_path, "w", encoding="ascii") as fh:
+                fh.write(f"dim {self.dim}\n")
+        with open(f"{self.path}.f32", "ab") as fh:
+            chunk.tofile(fh)
+        with open(keys_path, "a", encoding="ascii") as fh:
+            fh.write("".join(f"{k}\n" for k in keys))
+
+
+class EmbeddingsClient:
+    """Client for ``/v1/embeddings`` with batching, dedup and caching."""
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:1234",
+        model: str = "text-embedding-nomic-embed-text-v1.5",
+        batch_size: int = 64,
+        cache: Optional[VectorCache] = None,
+        timeout: int = 60,
+        connect_timeout: float = 5.0,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: Server URL (LM Studio or Ollama, without /v1)
+            model: Embedding model id
+            batch_size: Texts per request
+            cache: Vector cache; defaults to an in-memory one
+            timeout: Read timeout per request in seconds
+            connect_timeout: Seconds to establish a connection
+        """
+        from .lmstudio import get_session
+
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = batch_size
+        self.cache = cache if cache is not None else VectorCache()
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.session = get_session(self.base_url)
+        self.requests = 0
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts, in order.
+
+        Identical texts are sent once, cached texts are not sent at all,
+        and the rest go out in requests of ``batch_size``.
+        """
+        keys = [content_hash(t, self.model) for t in texts]
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in self.cache and key not in missing:
+                missing[key] = text
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            vectors = self._request([text for _, text in batch])
+            self.cache.put_many([key for key, _ in batch], vectors)
+
+        return [self.cache.get(key) for key in keys]
+
+    def embed_one(self, text: str) -> List[float]:
+        """Embed a single text."""
+        return self.embed([text])[0]
+
+    def _request(self, inputs: List[str]) -> List[List[float]]:
+        with tracing.span("embeddings.request", model=self.model, inputs=len(inputs)):
+            try:
+                response = self.session.post(
+                    f"{self.base_url}/v1/embeddings",
+                    json={"model": self.model, "input": inputs},
+                    timeout=(self.connect_timeout, self.timeout),
+                )
+                response.raise_for_status()
+                data = response.json().get("data", [])
+            except Exception as e:
+                raise RuntimeError(f"Embeddings request failed: {e}")
+        self.requests += 1
+        if len(data) != len(inputs):
+            raise RuntimeError(f"Expected {len(inputs)} embeddings, got {len(data)}")
+        return [d["embedding"] for d in sorted(data, key=lambda d: d.get("index", 0))]
+
+
+class VectorIndex:
+    """
+    In-memory cosine-similarity index.
+
+    Vectors are normalized on insert, so a search is one matrix-vector
+    product (with NumPy) plus a partial sort.
+    """
+
+    def __init__(self):
+        self.ids: List[Hashable] = []
+        self._rows: List[array] = []
+        self._matrix = None  # NumPy matrix, rebuilt after adds
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, ids: List[Hashable], vectors: List[Vector]):
+        """Add vectors under the given ids."""
+        for doc_id, vector in zip(ids, vectors):
+            norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+            self.ids.append(doc_id)
+            self._rows.append(array("f", (x / norm for x in vector)))
+        self._matrix = None
+
+    def clear(self):
+        self.ids, self._rows, self._matrix = [], [], None
+
+    def vectors(self) -> List[array]:
+        """Stored (normalized) vectors, in insertion order."""
+        return list(self._rows)
+
+    def search(self, query: Vector, top_k: int = 5) -> List[Tuple[Hashable, float]]:
+        """
+        Find the most similar vectors.
+
+        Returns:
+            (id, cosine similarity) pairs, best first
+        """
+        if not self.ids or top_k <= 0:
+            return []
+        norm = math.sqrt(sum(x * x for x in query)) or 1.0
+        if NUMPY_AVAILABLE:
+            if self._matrix is None:
+                self._matrix = np.frombuffer(
+                    b"".join(r.tobytes() for r in self._rows), dtype=np.float32
+                ).reshape(len(self._rows), -1)
+            scores = self._matrix @ (np.asarray(query, dtype=np.float32) / norm)
+            k = min(top_k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            return [(self.ids[i], float(scores[i])) for i in best]
+
+        q = [x / norm for x in query]
+        scored = ((sum(a * b for a, b in zip(row, q)), i) for i, row in enumerate(self._rows))
+        return [(self.ids[i], score) for score, i in heapq.nlargest(top_k, scored)]
@@ -5,10 +5,44 @@ Switch between different LLM backends:
 - Ollama (localhost:11435)
 - LM Studio (localhost:1234)
 - Custom endpoints
+
+Configuration is loaded lazily from an optional JSON/YAML file
+(LLM_CONFIG_FILE) with environment overrides, and reloaded when either
+changes, so a running team picks up new endpoints or models without a
+restart:
+
+    {
+      "provider": "lmstudio",
+      "lmstudio": {
+        "model": "openai/gpt-oss-20b",
+        "endpoints": [{"url": "http://gpu1:1234", "weight": 3},
+                      {"url": "http://gpu2:1234", "weight": 1}]
+      },
+      "roles": {
+        "reviewer": {"model": "qwen2.5-3b-instruct",
+                     "cascade_model": "openai/gpt-oss-20b"},
+        "architect": {"model": "openai/gpt-oss-120b"}
+      }
+    }
+
+Environment overrides:
+    LLM_PROVIDER        ollama | lmstudio | custom
+    LMSTUDIO_HOST       comma-separated URLs, each optionally "=weight"
+    LMSTUDIO_MODEL      default LM Studio model
+    OLLAMA_HOST         comma-separated URLs, each optionally "=weight"
+    OLLAMA_MODEL        default Ollama model
+    LLM_ROLE_MODELS     e.g. "reviewer=qwen2.5-3b-instruct,architect=openai/gpt-oss-120b"
+    LLM_ROLE_CASCADE    larger model per role for cascade escalation, same syntax
 """
 
 from enum import Enum
-from typing import Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+import json
+import os
+import random
+import threading
+import time
+
 from pydantic import BaseModel, Field
 
 
@@ -19,30 +53,54 @@ class LLMProvider(str, Enum):
     CUSTOM = "custom"
 
 
-class OllamaConfig(BaseModel):
+class Endpoint(BaseModel):
+    """A server URL and its share of the traffic."""
+    url: str
+    weight: float = 1.0
+
+
+class _EndpointsMixin:
+    """Endpoint selection shared by the provider configs."""
+
+    def all_endpoints(self) -> List[Endpoint]:
+        """Configured endpoints, or base_url alone when none are listed."""
+        return list(self.endpoints) or [Endpoint(url=self.base_url)]
+
+    def pick_endpoint(self) -> str:
+        """Choose an endpoint URL at random, proportionally to weight."""
+        endpoints = self.all_endpoints()
+        return random.choices(
+            [e.url for e in endpoints], weights=[e.weight for e in endpoints]
+        )[0]
+
+
+class OllamaConfig(_EndpointsMixin, BaseModel):
     """Ollama configuration."""
     provider: str = "ollama"
     base_url: str = "http://localhost:11435"
+    endpoints: List[Endpoint] = []
     model: str = "llama3"
     temperature: float = 0.7
     max_tokens: int = 500
     timeout: int = 120
 
 
-class LMStudioConfig(BaseModel):
+class LMStudioConfig(_EndpointsMixin, BaseModel):
     """LM Studio configuration."""
     provider: str = "lmstudio"
     base_url: str = "http://10.5.0.2:1234"
-    model: str = "gpt-oss-20b"
+    endpoints: List[Endpoint] = []
+    model: str = "openai/gpt-oss-20b"
     temperature: float = 0.7
     max_tokens: int = 500
     timeout: int = 120
 
 
-class CustomConfig(BaseModel):
+class CustomConfig(_EndpointsMixin, BaseModel):
     """Custom LLM endpoint configuration."""
     provider: str = "custom"
     base_url: str = Field(..., description="Full API endpoint URL")
+    endpoints: List[Endpoint] = []
     model: str = Field(..., description="Model name")
     temperature: float = 0.7
     max_tokens: int = 500
@@ -50,43 +108,241 @@ class CustomConfig(BaseModel):
     api_key: Optional[str] = None
 
 
+class RoleOverride(BaseModel):
+    """Per-role settings; unset fields fall back to the provider config."""
+    provider: Optional[LLMProvider] = None
+    model: Optional[str] = None
+    endpoints: List[Endpoint] = []
+    # Larger model an agent escalates to in cascade mode (see cascade.py)
+    cascade_model: Optional[str] = None
+
+
+def _role_key(role: Any) -> str:
+    """Normalize an AgentRole (or its name/value) to a lowercase key."""
+    return str(getattr(role, "name", role)).lower()
+
+
 class LLMConfig(BaseModel):
     """Main LLM configuration."""
     provider: LLMProvider = LLMProvider.OLLAMA
     ollama: OllamaConfig = OllamaConfig()
     lmstudio: LMStudioConfig = LMStudioConfig()
     custom: Optional[CustomConfig] = None
-    
+    roles: Dict[str, RoleOverride] = {}
+
     def get_config(self) -> Union[OllamaConfig, LMStudioConfig, CustomConfig]:
         """Get active configuration based on provider."""
-        if self.provider == LLMProvider.OLLAMA:
+        return self._provider_config(self.provider)
+
+    def configured_provider(self) -> Optional[LLMProvider]:
+        """The provider if set by the config file or LLM_PROVIDER, else None."""
+        fields_set = getattr(self, "model_fields_set", None)
+        if fields_set is None:
+            fields_set = self.__fields_set__
+        return self.provider if "provider" in fields_set else None
+
+    def _provider_config(
+        self, provider: LLMProvider
+    ) -> Union[OllamaConfig, LMStudioConfig, CustomConfig]:
+        if provider == LLMProvider.OLLAMA:
             return self.ollama
-        elif self.provider == LLMProvider.LMSTUDIO:
+        elif provider == LLMProvider.LMSTUDIO:
             return self.lmstudio
-        elif self.provider == LLMProvider.CUSTOM:
+        elif provider == LLMProvider.CUSTOM:
             if self.custom is None:
                 raise ValueError("Custom provider selected but no custom config provided")
             return self.custom
         else:
-            raise ValueError(f"Unknown provider: {self.provider}")
+            raise ValueError(f"Unknown provider: {provider}")
+
+    def role_override(self, role: Any) -> RoleOverride:
+        """
+        Overrides for a role.
+
+        Args:
+            role: AgentRole, or its name ("REVIEWER") or value ("code_reviewer")
+
+        Returns:
+            The matching RoleOverride (empty if the role has none)
+        """
+        keys = {_role_key(role), str(getattr(role, "value", role)).lower()}
+        for name, override in self.roles.items():
+            if name.lower() in keys:
+                return override
+        return RoleOverride()
+
+    def for_role(self, role: Any) -> Union[OllamaConfig, LMStudioConfig, CustomConfig]:
+        """Provider config for a role, with its model and endpoints applied."""
+        override = self.role_override(role)
+        config = self._provider_config(override.provider or self.provider)
+        updates = {}
+        if override.model:
+            updates["model"] = override.model
+        if override.endpoints:
+            updates["endpoints"] = override.endpoints
+        if not updates:
+            return config
+        return type(config)(**{**_dump(config), **updates})
+
+
+def _dump(model: BaseModel) -> Dict[str, Any]:
+    """Model fields as a dict (pydantic v1 and v2)."""
+    if hasattr(model, "model_dump"):
+        return model.model_dump()
+    return model.dict()
+
+
+def parse_endpoints(value: str) -> List[Endpoint]:
+    """
+    Parse "url[=weight],url[=weight],..." into endpoints.
+
+    >>> [e.weight for e in parse_endpoints("http://a:1234=3, http://b:1234")]
+    [3.0, 1.0]
+    """
+    endpoints = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        url, _, weight = item.rpartition("=")
+        try:
+            endpoints.append(Endpoint(url=url, weight=float(weight)))
+        except ValueError:
+            endpoints.append(Endpoint(url=item))
+    return endpoints
+
+
+# Environment variables folded into the configuration
+_ENV_KEYS = (
+    "LLM_PROVIDER",
+    "LMSTUDIO_HOST",
+    "LMSTUDIO_MODEL",
+    "OLLAMA_HOST",
+    "OLLAMA_MODEL",
+    "LLM_ROLE_MODELS",
+    "LLM_ROLE_CASCADE",
+)
+
+
+def _apply_env(data: Dict[str, Any], env: Dict[str, str]) -> Dict[str, Any]:
+    """Overlay environment settings onto raw config data."""
+    provider = env.get("LLM_PROVIDER")
+    if provider in {p.value for p in LLMProvider}:
+        data["provider"] = provider
+    for section, prefix in (("lmstudio", "LMSTUDIO"), ("ollama", "OLLAMA")):
+        if env.get(f"{prefix}_HOST"):
+            endpoints = parse_endpoints(env[f"{prefix}_HOST"])
+            data.setdefault(section, {})["endpoints"] = [_dump(e) for e in endpoints]
+        if env.get(f"{prefix}_MODEL"):
+            data.setdefault(section, {})["model"] = env[f"{prefix}_MODEL"]
+    for var, field in (("LLM_ROLE_MODELS", "model"), ("LLM_ROLE_CASCADE", "cascade_model")):
+        for item in env.get(var, "").split(","):
+            role, _, model = item.partition("=")
+            if role.strip() and model.strip():
+                data.setdefault("roles", {}).setdefault(role.strip().lower(), {})[field] = model.strip()
+    return data
+
+
+def _read_file(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as fh:
+        text = fh.read()
+    if path.endswith((".yaml", ".yml")):
+        import yaml  # only needed for YAML config files
+        return yaml.safe_load(text) or {}
+    return json.loads(text) if text.strip() else {}
+
+
+class ConfigSource:
+    """
+    Lazily loaded, hot-reloading LLM configuration.
+
+    The file and environment are read on the first get(); later calls check
+    (at most every ``check_interval`` seconds) whether the file's mtime or
+    the relevant environment variables changed, and rebuild the config if
+    so. A file that fails to parse keeps the last good config.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 2.0):
+        """
+        Initialize the source.
+
+        Args:
+            path: JSON or YAML config file (None = environment only)
+            check_interval: Minimum seconds between change checks
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.version = 0  # bumped on every successful (re)load
+        self._config: Optional[LLMConfig] = None
+        self._stamp: Optional[Tuple[Any, ...]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_stamp(self) -> Tuple[Any, ...]:
+        try:
+            mtime = os.stat(self.path).st_mtime_ns if self.path else None
+        except OSError:
+            mtime = None
+        return (mtime,) + tuple(os.environ.get(k) for k in _ENV_KEYS)
+
+    def get(self) -> LLMConfig:
+        """Current configuration, reloaded if its inputs changed."""
+        now = time.monotonic()
+        if self._config is not None and now - self._checked_at < self.check_interval:
+            return self._config
+        with self._lock:
+            self._checked_at = now
+            stamp = self._current_stamp()
+            if self._config is None or stamp != self._stamp:
+                self._load(stamp)
+            return self._config
+
+    def reload(self) -> LLMConfig:
+        """Re-read the file and environment now."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._load(self._current_stamp())
+            return self._config
+
+    def _load(self, stamp: Tuple[Any, ...]):
+        try:
+            data = _read_file(self.path) if self.path and stamp[0] is not None else {}
+            config = LLMConfig(**_apply_env(data, dict(os.environ)))
+        except Exception as e:
+            if self._config is None:
+                raise
+            print(f"⚠️  Keeping previous LLM config; reload of {self.path} failed: {e}")
+            self._stamp = stamp
+            return
+        self._config = config
+        self._stamp = stamp
+        self.version += 1
 
 
 # Default configurations
 DEFAULT_OLLAMA = OllamaConfig()
 DEFAULT_LMSTUDIO = LMStudioConfig()
 
-# Environment-aware defaults
-import os
+_source: Optional[ConfigSource] = None
+_source_lock = threading.Lock()
+
 
-if os.getenv("LLM_PROVIDER") == "lmstudio":
-    DEFAULT_CONFIG = LLMConfig(provider=LLMProvider.LMSTUDIO)
-elif os.getenv("LLM_PROVIDER") == "ollama":
-    DEFAULT_CONFIG = LLMConfig(provider=LLMProvider.OLLAMA)
-else:
-    # Auto-detect: Try LM Studio first, fallback to Ollama
-    DEFAULT_CONFIG = LLMConfig(provider=LLMProvider.OLLAMA)
+def get_config_source() -> ConfigSource:
+    """Process-wide config source (file from LLM_CONFIG_FILE, if set)."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = ConfigSource(os.getenv("LLM_CONFIG_FILE"))
+        return _source
 
 
 def get_default_config() -> LLMConfig:
     """Get default LLM configuration."""
-    return DEFAULT_CONFIG
+    return get_config_source().get()
+
+
+def __getattr__(name: str):
+    # DEFAULT_CONFIG used to be computed at import; keep it working, lazily.
+    if name == "DEFAULT_CONFIG":
+        return get_default_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
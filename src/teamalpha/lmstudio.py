@@ -3,145 +3,421 @@ LM Studio LLM Integration for TeamAlpha Agents
 
 Connects to LM Studio local models instead of Ollama.
 LM Studio typically runs on http://localhost:1234
+
+The LangChain wrapper, LMStudioLLM, lives in lmstudio_llm.py and is loaded
+on first access, so LMStudioClient users do not import LangChain,
+pydantic or httpx.
 """
 
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
+import json
+import threading
+import time
 import requests
-from langchain_core.language_models import LLM
-from pydantic import Field
+from requests.adapters import HTTPAdapter
+
+from . import tracing
+from .model_registry import get_registry
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+
+_sessions: Dict[Tuple[str, int], requests.Session] = {}
+_sessions_lock = threading.Lock()
 
 
-class LMStudioLLM(LLM):
+def get_session(base_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
     """
-    LangChain LLM wrapper for LM Studio.
-    
-    LM Studio exposes an OpenAI-compatible API.
-    Default: http://localhost:1234/v1
+    Shared keep-alive session for a server.
+
+    One session (and connection pool) exists per (base_url, pool_size), so
+    every client of the same server reuses warm TCP connections instead of
+    opening one per request. requests sessions are safe to share between
+    threads for plain requests like these; the pool holds up to
+    ``pool_size`` connections and extra concurrent requests wait for one
+    to free up.
     """
-    
-    base_url: str = Field(default="http://10.5.0.2:1234/v1")
-    model_name: str = Field(default="openai/gpt-oss-20b")
-    temperature: float = Field(default=0.7)
-    max_tokens: int = Field(default=500)
-    timeout: int = Field(default=120)
-    
+    key = (base_url, pool_size)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=pool_size, pool_block=True
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["Connection"] = "keep-alive"
+            _sessions[key] = session
+        return session
+
+
+def close_sessions():
+    """Close all shared sessions and their pooled connections."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+class LMStudioHTTPError(RuntimeError):
+    """Non-2xx response from LM Studio, with its status code."""
+
+    # Statuses meaning the server does not support the request itself (an
+    # endpoint or parameter), as opposed to being overloaded or failing
+    UNSUPPORTED_STATUSES = (400, 404, 422)
+
+    def __init__(self, status_code: int, message: str, body: str = ""):
+        super().__init__(f"LM Studio error {status_code}: {message}")
+        self.status_code = status_code
+        self.body = body
+
     @property
-    def _llm_type(self) -> str:
-        return "lmstudio"
-    
-    def _call(
-        self,
-        prompt: str,
-        stop: Optional[list[str]] = None,
-        run_manager=None,
-        **kwargs
-    ) -> str:
-        """Generate response from LM Studio."""
-        
-        headers = {
-            "Content-Type": "application/json",
-        }
-        
-        payload = {
-            "model": self.model_name,
-            "prompt": prompt,
-            "temperature": self.temperature,
-            "max_tokens": self.max_tokens,
-            "stop": stop or [],
-            "stream": False,
-        }
-        
+    def unsupported(self) -> bool:
+        """Whether retrying without the unsupported feature could succeed."""
+        return self.status_code in self.UNSUPPORTED_STATUSES
+
+
+def _http_error(error: Exception) -> LMStudioHTTPError:
+    """Convert a requests HTTPError or httpx HTTPStatusError into an LMStudioHTTPError."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return LMStudioHTTPError(0, str(error))
+    try:
+        body = response.text
+    except Exception:
+        body = ""
+    return LMStudioHTTPError(response.status_code, str(error), body)
+
+
+def _choice_text(result: Dict[str, Any]) -> str:
+    """Text of the first choice of a completions or chat-completions reply."""
+    choices = result.get("choices") or []
+    if not choices:
+        return ""
+    choice = choices[0]
+    if "message" in choice:
+        return choice["message"].get("content") or ""
+    return choice.get("text", "")
+
+
+def _sse_text(line: str) -> Optional[str]:
+    """
+    Text carried by one server-sent event line of a streamed completion.
+
+    Returns:
+        The chunk text ("" for keep-alives and empty deltas), or None once
+        the stream is done
+    """
+    if not line or not line.startswith("data:"):
+        return ""
+    data = line[len("data:"):].strip()
+    if data == "[DONE]":
+        return None
+    choices = json.loads(data).get("choices") or []
+    if not choices:
+        return ""
+    choice = choices[0]
+    if "delta" in choice:
+        return choice["delta"].get("content") or ""
+    return choice.get("text") or ""
+
+
+def _usage_attrs(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Token counts from an OpenAI-style ``usage`` block, for tracing."""
+    usage = result.get("usage") or {}
+    attrs = {}
+    if "prompt_tokens" in usage:
+        attrs["prompt_tokens"] = usage["prompt_tokens"]
+    if "completion_tokens" in usage:
+        attrs["output_tokens"] = usage["completion_tokens"]
+    return attrs
+
+
+@dataclass
+class ChatResponse:
+    """Assistant turn returned by the chat-completions endpoint."""
+
+    content: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    raw: Dict[str, Any] = field(default_factory=dict)
+    # All generated alternatives when n > 1 (choices[0] == content)
+    choices: List[str] = field(default_factory=list)
+    # Server token counts: prompt_tokens, completion_tokens, total_tokens
+    usage: Dict[str, int] = field(default_factory=dict)
+
+
+def parse_openai_tool_calls(message: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convert OpenAI ``tool_calls`` into the agent's {"tool", "args"} form.
+
+    Calls whose arguments are not valid JSON are kept with an ``error``
+    entry so the caller can report them instead of silently dropping them.
+    """
+    calls = []
+    for call in message.get("tool_calls") or []:
+        function = call.get("function", {})
+        arguments = function.get("arguments") or "{}"
+        entry = {"tool": function.get("name", ""), "args": {}, "id": call.get("id")}
         try:
-            response = requests.post(
-                f"{self.base_url}/completions",
-                json=payload,
-                headers=headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            
-            # Extract text from response
-            if "choices" in result and len(result["choices"]) > 0:
-                return result["choices"][0].get("text", "")
-            
-            return ""
-            
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError(
-                f"Cannot connect to LM Studio at {self.base_url}\n"
-                "Make sure LM Studio is running on http://localhost:1234"
-            )
-        except requests.exceptions.Timeout:
-            raise TimeoutError(
-                f"LM Studio request timed out after {self.timeout}s\n"
-                "Try increasing timeout or reducing max_tokens"
-            )
-        except Exception as e:
-            raise RuntimeError(f"LM Studio error: {str(e)}")
+            args = json.loads(arguments) if isinstance(arguments, str) else arguments
+            if not isinstance(args, dict):
+                raise ValueError("arguments must be a JSON object")
+            entry["args"] = args
+        except ValueError as e:
+            entry["error"] = f"Invalid arguments for {entry['tool']}: {e}"
+        calls.append(entry)
+    return calls
 
 
 class LMStudioClient:
     """Simple client for LM Studio HTTP API."""
     
-    def __init__(self, base_url: str = "http://10.5.0.2:1234"):
+    def __init__(
+        self,
+        base_url: str = "http://10.5.0.2:1234",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        default_model: str = "openai/gpt-oss-20b",
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: LM Studio server URL
+            default_model: Model used when a call does not name one
+            pool_size: Keep-alive connections to the server, shared with
+                other clients of the same URL (see get_session)
+            connect_timeout: Seconds to establish a connection; the
+                per-call ``timeout`` arguments bound reading the response
+        """
         self.base_url = base_url
         self.api_url = f"{base_url}/v1"
+        self.connect_timeout = connect_timeout
+        self.default_model = default_model
+        self.session = get_session(base_url, pool_size)
     
     def health(self) -> dict:
         """Check if LM Studio is running."""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/health",
-                timeout=5
+                timeout=(self.connect_timeout, 5)
             )
             return response.json() if response.ok else {"status": "offline"}
         except:
             return {"status": "offline"}
     
-    def list_models(self) -> list[dict]:
-        """List available models in LM Studio."""
-        try:
-            response = requests.get(
-                f"{self.api_url}/models",
-                timeout=5
+    def list_models(self, refresh: bool = False) -> list[dict]:
+        """
+        List available models in LM Studio.
+
+        Served from the shared model registry, which re-queries the server
+        at most once per TTL (or now, with ``refresh``). Entries carry the
+        server's fields plus ``loaded``, ``context_length`` and
+        ``capabilities``.
+        """
+        state = get_registry().endpoint(self.base_url, "lmstudio", force=refresh)
+        if not state.healthy:
+            raise ConnectionError(f"Cannot connect to LM Studio: {state.error}")
+        return [
+            dict(
+                m.raw,
+                id=m.id,
+                loaded=m.loaded,
+                context_length=m.context_length,
+                capabilities=sorted(m.capabilities),
             )
-            response.raise_for_status()
-            return response.json().get("data", [])
-        except Exception as e:
-            raise ConnectionError(f"Cannot connect to LM Studio: {e}")
+            for m in state.models.values()
+        ]
     
     def generate(
         self,
         prompt: str,
-        model: str = "openai/gpt-oss-20b",
+        model: Optional[str] = None,
         max_tokens: int = 500,
         temperature: float = 0.7,
-        timeout: int = 120
+        timeout: int = 120,
+        session_id: Optional[str] = None,
     ) -> str:
-        """Generate text from prompt."""
+        """
+        Generate text from prompt.
+
+        Args:
+            session_id: Stable caller id (sent as the OpenAI ``user`` field)
+                so the server can keep reusing the cached prompt prefix
+        """
         
         payload = {
-            "model": model,
+            "model": model or self.default_model,
             "prompt": prompt,
             "temperature": temperature,
             "max_tokens": max_tokens,
             "stream": False,
+            "cache_prompt": True,
         }
+        if session_id:
+            payload["user"] = session_id
         
+        result = self._post("completions", payload, timeout)
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0].get("text", "")
+        return ""
+
+    def generate_stream(
+        self,
+        prompt: str,
+        model: Optional[str] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        timeout: int = 120,
+        session_id: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Stream generated text chunks as the server produces them.
+
+        Same arguments as generate(); consumes the server-sent events of
+        ``/v1/completions`` with ``"stream": true``.
+        """
+        payload = {
+            "model": model or self.default_model,
+            "prompt": prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            "cache_prompt": True,
+        }
+        if session_id:
+            payload["user"] = session_id
+
+        # Timed by hand: a span opened in a generator would become the
+        # parent of whatever the consumer does between chunks.
+        started = time.perf_counter()
+        first_chunk = None
+        chunks = 0
         try:
-            response = requests.post(
+            with self.session.post(
                 f"{self.api_url}/completions",
                 json=payload,
-                timeout=timeout
+                timeout=(self.connect_timeout, timeout),
+                stream=True,
+            ) as response:
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError as e:
+                    # Convert here, while the streamed body can still be read.
+                    raise _http_error(e) from e
+                for line in response.iter_lines(decode_unicode=True):
+                    text = _sse_text(line)
+                    if text is None:
+                        return
+                    if text:
+                        if first_chunk is None:
+                            first_chunk = time.perf_counter()
+                        chunks += 1
+                        yield text
+        except requests.exceptions.ConnectionError:
+            raise ConnectionError(
+                f"Cannot connect to LM Studio at {self.base_url}\n"
+                f"Ensure LM Studio is running: {self.base_url}"
             )
-            response.raise_for_status()
-            
-            result = response.json()
-            if "choices" in result and len(result["choices"]) > 0:
-                return result["choices"][0].get("text", "")
-            return ""
+        except requests.exceptions.Timeout:
+            raise TimeoutError(f"LM Studio request timed out after {timeout}s")
+        finally:
+            tracing.record(
+                "lmstudio.stream",
+                started,
+                model=model or self.default_model,
+                chunks=chunks,
+                ttft_ms=(first_chunk - started) * 1000 if first_chunk else None,
+            )
+
+    def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        timeout: int = 120,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        tool_choice: str = "auto",
+        session_id: Optional[str] = None,
+        n: int = 1,
+        stop: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+    ) -> ChatResponse:
+        """
+        Run a chat completion, optionally with native tool calling.
+
+        Sending structured system/user/assistant messages lets the server
+        apply the model's chat template, and an unchanged system message
+        keeps its cached prefix warm across calls.
+
+        Args:
+            messages: OpenAI-style messages (role/content)
+            tools: JSON-schema function definitions (see Tool.to_schema);
+                the model's structured ``tool_calls`` come back parsed
+            tool_choice: "auto", "none" or "required"
+            session_id: Stable caller id, see generate()
+            n: Number of alternative completions to generate
+            stop: Stop sequences
+            seed: Sampling seed for reproducible output
+
+        Returns:
+            ChatResponse with the assistant text, parsed tool calls, all
+            alternatives and the server's token usage
+        """
+        payload = {
+            "model": model or self.default_model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": False,
+            "cache_prompt": True,
+        }
+        if tools:
+            payload["tools"] = tools
+            payload["tool_choice"] = tool_choice
+        if session_id:
+            payload["user"] = session_id
+        if n > 1:
+            payload["n"] = n
+        if stop:
+            payload["stop"] = stop
+        if seed is not None:
+            payload["seed"] = seed
+
+        result = self._post("chat/completions", payload, timeout)
+        usage = result.get("usage") or {}
+        if not result.get("choices"):
+            return ChatResponse(content="", raw=result, usage=usage)
+        message = result["choices"][0].get("message", {})
+        return ChatResponse(
+            content=message.get("content") or "",
+            tool_calls=parse_openai_tool_calls(message),
+            raw=result,
+            choices=[
+                (c.get("message") or {}).get("content") or "" for c in result["choices"]
+            ],
+            usage=usage,
+        )
+
+    def _post(self, path: str, payload: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        """POST to an OpenAI-compatible endpoint and return the JSON body."""
+        try:
+            with tracing.span("lmstudio.request", path=path, model=payload.get("model")) as span:
+                response = self.session.post(
+                    f"{self.api_url}/{path}",
+                    json=payload,
+                    timeout=(self.connect_timeout, timeout)
+                )
+                response.raise_for_status()
+                result = response.json()
+                if span:
+                    span.set(**_usage_attrs(result))
+                return result
         
         except requests.exceptions.ConnectionError:
             raise ConnectionError(
@@ -150,10 +426,21 @@ class LMStudioClient:
             )
         except requests.exceptions.Timeout:
             raise TimeoutError(f"LM Studio request timed out after {timeout}s")
+        except requests.exceptions.HTTPError as e:
+            raise _http_error(e) from e
         except Exception as e:
             raise RuntimeError(f"LM Studio error: {str(e)}")
 
 
+def __getattr__(name: str):
+    # Keep ``from .lmstudio import LMStudioLLM`` working without importing
+    # LangChain for every user of this module.
+    if name in ("LMStudioLLM", "HTTPX_AVAILABLE"):
+        from . import lmstudio_llm
+        return getattr(lmstudio_llm, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # Usage example:
 if __name__ == "__main__":
     # Test connection
@@ -0,0 +1,320 @@
+"""
+LangChain LLM wrapper for LM Studio.
+
+Split from lmstudio.py because LangChain, pydantic and httpx take hundreds
+of milliseconds to import; ``from .lmstudio import LMStudioLLM`` still
+works and loads this module on first use.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+import asyncio
+import time
+import weakref
+import requests
+from langchain_core.language_models import LLM
+from langchain_core.outputs import GenerationChunk
+from pydantic import Field
+
+from . import tracing
+from .lmstudio import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    _choice_text,
+    _http_error,
+    _sse_text,
+    _usage_attrs,
+    get_session,
+)
+
+# Optional async HTTP client for native ainvoke/astream
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+# httpx.AsyncClient is bound to the event loop it was first used on, so
+# async clients are pooled per loop. Close them with aclose_async_clients()
+# (or LMStudioLLM.aclose()) before the loop ends.
+_async_clients: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _get_async_client(base_url: str, pool_size: int = DEFAULT_POOL_SIZE):
+    """Shared keep-alive httpx.AsyncClient for a server on the running loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    key = (base_url, pool_size)
+    if key not in clients:
+        clients[key] = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=pool_size, max_keepalive_connections=pool_size
+            ),
+        )
+    return clients[key]
+
+
+async def aclose_async_clients(base_url: Optional[str] = None):
+    """
+    Close the running loop's shared async clients.
+
+    Args:
+        base_url: Only close clients for this server (None = all)
+    """
+    clients = _async_clients.get(asyncio.get_running_loop(), {})
+    for key in [k for k in clients if base_url is None or k[0] == base_url]:
+        await clients.pop(key).aclose()
+
+
+class LMStudioLLM(LLM):
+    """
+    LangChain LLM wrapper for LM Studio.
+    
+    LM Studio exposes an OpenAI-compatible API.
+    Default: http://localhost:1234/v1
+
+    Supports invoke/stream and, with httpx installed, native ainvoke/astream.
+    Set ``use_chat`` to send the prompt as a user message to
+    ``/chat/completions`` instead of ``/completions``.
+    """
+    
+    base_url: str = Field(default="http://10.5.0.2:1234/v1")
+    model_name: str = Field(default="openai/gpt-oss-20b")
+    temperature: float = Field(default=0.7)
+    max_tokens: int = Field(default=500)
+    timeout: int = Field(default=120)
+    connect_timeout: float = Field(default=DEFAULT_CONNECT_TIMEOUT)
+    pool_size: int = Field(default=DEFAULT_POOL_SIZE)
+    use_chat: bool = Field(default=False)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "lmstudio"
+
+    @property
+    def _endpoint(self) -> str:
+        path = "chat/completions" if self.use_chat else "completions"
+        return f"{self.base_url}/{path}"
+
+    def _payload(self, prompt: str, stop: Optional[list[str]], stream: bool) -> Dict[str, Any]:
+        payload = {
+            "model": self.model_name,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stop": stop or [],
+            "stream": stream,
+            # Keep the KV cache of the shared prompt prefix between calls
+            "cache_prompt": True,
+        }
+        if self.use_chat:
+            payload["messages"] = [{"role": "user", "content": prompt}]
+        else:
+            payload["prompt"] = prompt
+        return payload
+
+    def _connection_error(self) -> ConnectionError:
+        return ConnectionError(
+            f"Cannot connect to LM Studio at {self.base_url}\n"
+            "Make sure LM Studio is running on http://localhost:1234"
+        )
+
+    def _timeout_error(self) -> TimeoutError:
+        return TimeoutError(
+            f"LM Studio request timed out after {self.timeout}s\n"
+            "Try increasing timeout or reducing max_tokens"
+        )
+
+    async def aclose(self):
+        """Close the async client this LLM shares on the running loop."""
+        if HTTPX_AVAILABLE:
+            await aclose_async_clients(self.base_url)
+    
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs
+    ) -> str:
+        """Generate response from LM Studio."""
+        
+        headers = {
+            "Content-Type": "application/json",
+        }
+        
+        try:
+            with tracing.span("lmstudio.completions", model=self.model_name) as span:
+                response = get_session(self.base_url, self.pool_size).post(
+                    self._endpoint,
+                    json=self._payload(prompt, stop, stream=False),
+                    headers=headers,
+                    timeout=(self.connect_timeout, self.timeout)
+                )
+                response.raise_for_status()
+                
+                result = response.json()
+                if span:
+                    span.set(**_usage_attrs(result))
+            
+            return _choice_text(result)
+            
+        except requests.exceptions.ConnectionError:
+            raise self._connection_error()
+        except requests.exceptions.Timeout:
+            raise self._timeout_error()
+        except requests.exceptions.HTTPError as e:
+            raise _http_error(e) from e
+        except Exception as e:
+            raise RuntimeError(f"LM Studio error: {str(e)}")
+
+    def _stream(
+        self,
+        prompt: str,
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs
+    ) -> Iterator[GenerationChunk]:
+        """
+        Stream tokens from LM Studio as they are generated.
+
+        Closing the iterator early (e.g. breaking out of ``llm.stream``)
+        closes the response, which makes the server stop generating.
+        """
+        started = time.perf_counter()
+        first_chunk = None
+        try:
+            with get_session(self.base_url, self.pool_size).post(
+                self._endpoint,
+                json=self._payload(prompt, stop, stream=True),
+                timeout=(self.connect_timeout, self.timeout),
+                stream=True,
+            ) as response:
+                try:
+                    response.raise_for_status()
+                except requests.exceptions.HTTPError as e:
+                    # Convert here, while the streamed body can still be read.
+                    raise _http_error(e) from e
+                for line in response.iter_lines(decode_unicode=True):
+                    text = _sse_text(line)
+                    if text is None:
+                        return
+                    if not text:
+                        continue
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter()
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        run_manager.on_llm_new_token(text, chunk=chunk)
+                    yield chunk
+        except requests.exceptions.ConnectionError:
+            raise self._connection_error()
+        except requests.exceptions.Timeout:
+            raise self._timeout_error()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise RuntimeError(f"LM Studio error: {str(e)}")
+        finally:
+            tracing.record(
+                "lmstudio.stream",
+                started,
+                model=self.model_name,
+                ttft_ms=(first_chunk - started) * 1000 if first_chunk else None,
+            )
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs
+    ) -> str:
+        """
+        Generate a response without blocking the event loop.
+
+        Falls back to LangChain's default (running _call in a thread) when
+        httpx is not installed. Cancelling the awaiting task aborts the
+        request.
+        """
+        if not HTTPX_AVAILABLE:
+            return await super()._acall(prompt, stop=stop, run_manager=run_manager, **kwargs)
+
+        client = _get_async_client(self.base_url, self.pool_size)
+        try:
+            with tracing.span("lmstudio.completions", model=self.model_name) as span:
+                response = await client.post(
+                    self._endpoint,
+                    json=self._payload(prompt, stop, stream=False),
+                    timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                )
+                response.raise_for_status()
+                result = response.json()
+                if span:
+                    span.set(**_usage_attrs(result))
+            return _choice_text(result)
+        except httpx.ConnectError:
+            raise self._connection_error()
+        except httpx.TimeoutException:
+            raise self._timeout_error()
+        except httpx.HTTPStatusError as e:
+            raise _http_error(e) from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise RuntimeError(f"LM Studio error: {str(e)}")
+
+    async def _astream(
+        self,
+        prompt: str,
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs
+    ) -> AsyncIterator[GenerationChunk]:
+        """
+        Stream tokens without blocking the event loop.
+
+        Cancelling the consuming task (or closing the iterator) closes the
+        response. Falls back to LangChain's default without httpx.
+        """
+        if not HTTPX_AVAILABLE:
+            async for chunk in super()._astream(
+                prompt, stop=stop, run_manager=run_manager, **kwargs
+            ):
+                yield chunk
+            return
+
+        client = _get_async_client(self.base_url, self.pool_size)
+        started = time.perf_counter()
+        first_chunk = None
+        try:
+            async with client.stream(
+                "POST",
+                self._endpoint,
+                json=self._payload(prompt, stop, stream=True),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            ) as response:
+                if response.is_error:
+                    await response.aread()  # so the error carries the body
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    text = _sse_text(line)
+                    if text is None:
+                        return
+                    if not text:
+                        continue
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter()
+                    chunk = GenerationChunk(text=text)
+                    if run_manager:
+                        await run_manager.on_llm_new_token(text, chunk=chunk)
+                    yield chunk
+        except httpx.ConnectError:
+            raise self._connection_error()
+        except httpx.TimeoutException:
+            raise self._timeout_error()
+        except httpx.HTTPStatusError as e:
+            raise _http_error(e) from e
+        except (httpx.HTTPError, ValueError) as e:
+            raise RuntimeError(f"LM Studio error: {str(e)}")
+        finally:
+            tracing.record(
+                "lmstudio.stream",
+                started,
+                model=self.model_name,
+                ttft_ms=(first_chunk - started) * 1000 if first_chunk else None,
+            )
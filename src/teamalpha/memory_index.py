@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Incremental BM25 index over agent memory for relevance-based retrieval."""
+
+from collections import Counter
+from typing import Dict, List, Tuple
+import math
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+# Very common words carry no signal for ranking and bloat the postings.
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the "
+    "this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase index terms."""
+    return [
+        t for t in _TOKEN_RE.findall(text.lower())
+        if t not in _STOPWORDS
+    ]
+
+
+class MemoryIndex:
+    """
+    Inverted index with Okapi BM25 scoring.
+
+    Documents are identified by integer ids (the position of the message in
+    ``Agent.memory``) and are added one at a time, so the index stays in step
+    with memory without ever being rebuilt.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term-frequency saturation parameter
+            b: Document-length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: int, text: str):
+        """Index a document."""
+        terms = tokenize(text)
+        self.doc_lengths[doc_id] = len(terms)
+        self.total_length += len(terms)
+        for term, tf in Counter(terms).items():
+            self.postings.setdefault(term, {})[doc_id] = tf
+
+    def clear(self):
+        """Drop all indexed documents."""
+        self.postings.clear()
+        self.doc_lengths.clear()
+        self.total_length = 0
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Rank documents against a query.
+
+        Args:
+            query: Free-text query (usually the task description)
+            top_k: Maximum number of results
+
+        Returns:
+            List of (doc_id, score) pairs, best first. Documents sharing no
+            terms with the query are not returned.
+        """
+        n_docs = len(self.doc_lengths)
+        if not n_docs or top_k <= 0:
+            return []
+
+        avg_len = self.total_length / n_docs or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for doc_id, tf in docs.items():
+                norm = self.k1 * (
+                    1 - self.b + self.b * self.doc_lengths[doc_id] / avg_len
+                )
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                    tf * (self.k1 + 1) / (tf + norm)
+                )
+
+        # Ties go to the more recent message.
+        ranked = sorted(scores.items(), key=lambda s: (s[1], s[0]), reverse=True)
+        return ranked[:top_k]
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Cached model discovery for LM Studio and Ollama endpoints.
+
+Records which models each endpoint has loaded, their context length and
+capabilities, refreshing at most every ``ttl`` seconds. Routing a request
+to an endpoint that already has the model in memory avoids the multi-second
+model swap an unloaded model triggers.
+
+Capabilities are normalized to: "completion", "chat", "tools",
+"embeddings" and "vision".
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+from dataclasses import dataclass, field
+import random
+import threading
+import time
+
+import requests
+
+
+@dataclass
+class ModelInfo:
+    """A model available on an endpoint."""
+
+    id: str
+    loaded: bool
+    context_length: Optional[int] = None
+    capabilities: Set[str] = field(default_factory=set)
+    raw: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class EndpointState:
+    """Last discovery result for one endpoint."""
+
+    url: str
+    kind: str  # "lmstudio" or "ollama"
+    healthy: bool = False
+    models: Dict[str, ModelInfo] = field(default_factory=dict)
+    refreshed_at: float = 0.0
+    error: Optional[str] = None
+
+
+def _lmstudio_capabilities(entry: Dict[str, Any]) -> Set[str]:
+    kind = entry.get("type", "llm")
+    if kind == "embeddings":
+        return {"embeddings"}
+    caps = {"completion", "chat"}
+    if "tool_use" in (entry.get("capabilities") or []):
+        caps.add("tools")
+    if kind == "vlm":
+        caps.add("vision")
+    return caps
+
+
+def _ollama_capabilities(names: List[str]) -> Set[str]:
+    caps = set()
+    for name in names:
+        if name == "completion":
+            caps.update(("completion", "chat"))
+        elif name == "embedding":
+            caps.add("embeddings")
+        elif name in ("tools", "vision"):
+            caps.add(name)
+    return caps
+
+
+class ModelRegistry:
+    """Thread-safe, TTL-cached view of the models on each endpoint."""
+
+    def __init__(self, ttl: float = 30.0, timeout: float = 3.0):
+        """
+        Initialize the registry.
+
+        Args:
+            ttl: Seconds before an endpoint is re-queried
+            timeout: Per-request timeout for discovery calls
+        """
+        self.ttl = ttl
+        self.timeout = timeout
+        self._endpoints: Dict[str, EndpointState] = {}
+        # /api/show results never change for a given model digest.
+        self._ollama_details: Dict[Tuple[str, str], Tuple[Set[str], Optional[int]]] = {}
+        self._lock = threading.Lock()
+        self._refresh_locks: Dict[str, threading.Lock] = {}
+        self._round_robin = 0
+        self._session = requests.Session()
+
+    def add_endpoint(self, url: str, kind: str = "lmstudio"):
+        """Register an endpoint (no-op if known)."""
+        url = url.rstrip("/")
+        with self._lock:
+            if url not in self._endpoints:
+                self._endpoints[url] = EndpointState(url=url, kind=kind)
+                self._refresh_locks[url] = threading.Lock()
+
+    def endpoint(self, url: str, kind: str = "lmstudio", force: bool = False) -> EndpointState:
+        """
+        Current state of an endpoint, refreshed when older than the TTL.
+
+        Concurrent callers share one refresh instead of each querying the
+        server.
+        """
+        url = url.rstrip("/")
+        self.add_endpoint(url, kind)
+        state = self._endpoints[url]
+        if force or time.monotonic() - state.refreshed_at >= self.ttl:
+            with self._refresh_locks[url]:
+                state = self._endpoints[url]
+                if force or time.monotonic() - state.refreshed_at >= self.ttl:
+                    state = self._discover(state)
+                    with self._lock:
+                        self._endpoints[url] = state
+        return state
+
+    def refresh(self):
+        """Re-query every known endpoint now."""
+        for url, state in list(self._endpoints.items()):
+            self.endpoint(url, state.kind, force=True)
+
+    def is_healthy(self, url: str, kind: str = "lmstudio") -> bool:
+        """Whether the endpoint answered its last discovery call."""
+        return self.endpoint(url, kind).healthy
+
+    def models(self, url: str, kind: str = "lmstudio") -> List[ModelInfo]:
+        """Models available on an endpoint."""
+        return list(self.endpoint(url, kind).models.values())
+
+    def get(self, url: str, model: str, kind: str = "lmstudio") -> Optional[ModelInfo]:
+        """Info for one model on an endpoint, if available there."""
+        return self.endpoint(url, kind).models.get(model)
+
+    def route(
+        self,
+        model: str,
+        endpoints: List[str],
+        capability: Optional[str] = None,
+        kind: str = "lmstudio",
+        weights: Optional[Dict[str, float]] = None,
+    ) -> Optional[str]:
+        """
+        Pick the endpoint to send a request for ``model`` to.
+
+        Prefers healthy endpoints that already have the model loaded
+        (round-robin among them, or weighted-random with ``weights``), then
+        ones that can load it, then any healthy endpoint.
+
+        Args:
+            model: Model id
+            endpoints: Candidate endpoint URLs
+            capability: Required capability, e.g. "tools" or "embeddings"
+            kind: Kind of endpoints not registered yet
+            weights: Relative traffic share per endpoint URL
+
+        Returns:
+            Endpoint URL, or None if no endpoint is healthy
+        """
+        loaded, available, healthy = [], [], []
+        for url in endpoints:
+            state = self.endpoint(url, kind)
+            if not state.healthy:
+                continue
+            healthy.append(state.url)
+            info = state.models.get(model)
+            if info is None or (capability and info.capabilities and capability not in info.capabilities):
+                continue
+            (loaded if info.loaded else available).append(state.url)
+
+        for group in (loaded, available, healthy):
+            if group and weights:
+                return random.choices(
+                    group, weights=[weights.get(url, 1.0) for url in group]
+                )[0]
+            if group:
+                with self._lock:
+                    self._round_robin += 1
+                    return group[self._round_robin % len(group)]
+        return None
+
+    # -- discovery ---------------------------------------------------------
+
+    def _get(self, url: str) -> Dict[str, Any]:
+        response = self._session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def _discover(self, state: EndpointState) -> EndpointState:
+        fresh = EndpointState(url=state.url, kind=state.kind, refreshed_at=time.monotonic())
+        try:
+            if state.kind == "ollama":
+                fresh.models = self._discover_ollama(state.url)
+            else:
+                fresh.models = self._discover_lmstudio(state.url)
+            fresh.healthy = True
+        except Exception as e:
+            fresh.error = str(e)
+        return fresh
+
+    def _discover_lmstudio(self, url: str) -> Dict[str, ModelInfo]:
+        try:
+            # Native REST API: includes load state, type and context length.
+            entries = self._get(f"{url}/api/v0/models").get("data", [])
+            return {
+                e["id"]: ModelInfo(
+                    id=e["id"],
+                    loaded=e.get("state") == "loaded",
+                    context_length=e.get("loaded_context_length") or e.get("max_context_length"),
+                    capabilities=_lmstudio_capabilities(e),
+                    raw=e,
+                )
+                for e in entries
+            }
+        except requests.exceptions.HTTPError:
+            pass
+        # OpenAI-compatible fallback: load state and capabilities unknown.
+        entries = self._get(f"{url}/v1/models").get("data", [])
+        return {e["id"]: ModelInfo(id=e["id"], loaded=True, raw=e) for e in entries}
+
+    def _discover_ollama(self, url: str) -> Dict[str, ModelInfo]:
+        tags = self._get(f"{url}/api/tags").get("models", [])
+        try:
+            running = {m["name"]: m for m in self._get(f"{url}/api/ps").get("models", [])}
+        except requests.exceptions.HTTPError:
+            running = {}
+
+        models = {}
+        for entry in tags:
+            name = entry["name"]
+            caps, context_length = self._ollama_show(url, name, entry.get("digest", ""))
+            if name in running and running[name].get("context_length"):
+                context_length = running[name]["context_length"]
+            models[name] = ModelInfo(
+                id=name,
+                loaded=name in running,
+                context_length=context_length,
+                capabilities=caps,
+                raw=entry,
+            )
+        return models
+
+    def _ollama_show(self, url: str, name: str, digest: str) -> Tuple[Set[str], Optional[int]]:
+        key = (url, f"{name}@{digest}")
+        if key not in self._ollama_details:
+            try:
+                response = self._session.post(
+                    f"{url}/api/show", json={"model": name}, timeout=self.timeout
+                )
+                response.raise_for_status()
+                details = response.json()
+                context_length = next(
+                    (v for k, v in (details.get("model_info") or {}).items()
+                     if k.endswith(".context_length")),
+                    None,
+                )
+                self._ollama_details[key] = (
+                    _ollama_capabilities(details.get("capabilities") or ["completion"]),
+                    context_length,
+                )
+            except Exception:
+                return {"completion", "chat"}, None
+        return self._ollama_details[key]
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Process-wide registry shared by all clients and agents."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
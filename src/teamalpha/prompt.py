@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Token-budgeted prompt assembly."""
+
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import math
+
+# Context window assumed when the model's real limit is unknown. Small local
+# models (llama3 8B, most GGUF quants served by LM Studio) are at least this big.
+DEFAULT_CONTEXT_WINDOW = 4096
+
+
+class ApproxTokenizer:
+    """
+    Fast character-based token estimate.
+
+    Roughly four characters per token holds for English prose and code with
+    BPE tokenizers; it never touches the model's vocabulary, so it costs
+    nothing to call on every prompt section.
+    """
+
+    def __init__(self, chars_per_token: float = 4.0):
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        """Estimate the number of tokens in text."""
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+class FunctionTokenizer:
+    """
+    Adapt an encode function to the tokenizer interface.
+
+    Example:
+        enc = tiktoken.get_encoding("cl100k_base")
+        tokenizer = FunctionTokenizer(enc.encode)
+    """
+
+    def __init__(self, encode: Callable[[str], list]):
+        self.encode = encode
+
+    def count(self, text: str) -> int:
+        """Count tokens by encoding text."""
+        return len(self.encode(text))
+
+
+def get_tokenizer(tokenizer=None):
+    """Return a tokenizer object, wrapping plain encode functions."""
+    if tokenizer is None:
+        return ApproxTokenizer()
+    if hasattr(tokenizer, "count"):
+        return tokenizer
+    if callable(tokenizer):
+        return FunctionTokenizer(tokenizer)
+    raise TypeError(f"Unsupported tokenizer: {type(tokenizer)}")
+
+
+def truncate_to_tokens(
+    text: str,
+    max_tokens: int,
+    tokenizer=None,
+    marker: str = "...",
+    keep_tail: bool = False,
+) -> str:
+    """
+    Cut text down to at most max_tokens tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit
+        tokenizer: Tokenizer (defaults to ApproxTokenizer)
+        marker: Marks where text was cut
+        keep_tail: Keep the end of the text instead of the start
+
+    Returns:
+        The original text if it fits, otherwise a prefix ending in marker
+        (with keep_tail, a suffix starting with marker)
+    """
+    tokenizer = get_tokenizer(tokenizer)
+    if tokenizer.count(text) <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+
+    # Binary search on character length; tokenizers are monotone enough in
+    # prefix length for this to land on the longest fitting prefix.
+    def cut(length: int) -> str:
+        return marker + text[len(text) - length:] if keep_tail else text[:length] + marker
+
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if tokenizer.count(cut(mid)) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return cut(lo) if lo else ""
+
+
+@dataclass
+class PromptSection:
+    """A named piece of a prompt."""
+
+    name: str
+    text: str
+    priority: int = 0  # lower fills first
+    required: bool = False
+    truncatable: bool = True
+    tokens: Optional[int] = None  # precomputed count, e.g. for cached text
+    keep_tail: bool = False  # truncate from the start, keeping the newest text
+
+
+@dataclass
+class BuiltPrompt:
+    """Result of assembling a prompt under a budget."""
+
+    text: str
+    tokens: int
+    budget: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    sections: Dict[str, str] = field(default_factory=dict)  # final text by name
+
+
+class PromptBuilder:
+    """Assemble prompt sections in priority order up to the context window."""
+
+    def __init__(
+        self,
+        context_window: int = DEFAULT_CONTEXT_WINDOW,
+        reserve_tokens: int = 500,
+        tokenizer=None,
+        separator: str = "\n\n",
+    ):
+        """
+        Initialize a prompt builder.
+
+        Args:
+            context_window: Model context window in tokens
+            reserve_tokens: Tokens kept free for the completion
+            tokenizer: Object with count(text) -> int, or an encode function
+            separator: Text placed between sections
+        """
+        self.context_window = context_window
+        self.reserve_tokens = reserve_tokens
+        self.tokenizer = get_tokenizer(tokenizer)
+        self.separator = separator
+
+    @property
+    def budget(self) -> int:
+        """Tokens available for the prompt itself."""
+        return max(0, self.context_window - self.reserve_tokens)
+
+    def count(self, text: str) -> int:
+        """Count tokens with the configured tokenizer."""
+        return self.tokenizer.count(text)
+
+    def build(self, sections: List[PromptSection]) -> BuiltPrompt:
+        """
+        Fit sections into the budget.
+
+        Required sections are placed first and always included; one that
+        is truncatable is cut only as far as needed to leave room for the
+        required sections after it (truncatable ones get at least an equal
+        share of what is left). The rest are filled by priority; a
+        section that does not fit is truncated if allowed, otherwise
+        dropped. Output keeps the sections' original order.
+
+        Args:
+            sections: Sections in the order they should appear
+
+        Returns:
+            BuiltPrompt with the text and a report of what was cut
+
+        Raises:
+            ValueError: If the required sections alone cannot fit the budget
+        """
+        budget = self.budget
+        sep_cost = self.count(self.separator)
+        order = sorted(
+            range(len(sections)),
+            key=lambda i: (not sections[i].required, sections[i].priority, i),
+        )
+        counts: Dict[int, int] = {}
+        for i, section in enumerate(sections):
+            if section.text:
+                tokens = section.tokens
+                counts[i] = self.count(section.text) if tokens is None else tokens
+        # Room still owed to untruncatable required sections not yet placed
+        # (each follows at least one section, so pays a separator).
+        reserved = sum(
+            counts[i] + sep_cost
+            for i in counts
+            if sections[i].required and not sections[i].truncatable
+        )
+        # Truncatable required sections not yet placed, in placement order
+        shared = [
+            i for i in order
+            if i in counts and sections[i].required and sections[i].truncatable
+        ]
+
+        chosen: dict = {}
+        truncated: List[str] = []
+        dropped: List[str] = []
+        used = 0
+        for i in order:
+            if i not in counts:
+                continue
+            section = sections[i]
+            sep = sep_cost if chosen else 0
+            if section.required and section.truncatable:
+                shared.remove(i)
+            elif section.required:
+                reserved -= counts[i] + sep_cost
+            remaining = budget - used - (reserved if section.required else 0)
+            if counts[i] + sep <= remaining:
+                chosen[i] = section.text
+                used += counts[i] + sep
+                continue
+            if section.truncatable:
+                room = remaining - sep
+                if section.required:
+                    share = room // (len(shared) + 1)
+                    room -= sum(min(counts[j], share) + sep_cost for j in shared)
+                text = truncate_to_tokens(
+                    section.text, room, self.tokenizer, keep_tail=section.keep_tail
+                )
+                if text:
+                    chosen[i] = text
+                    used += self.count(text) + sep
+                    truncated.append(section.name)
+                    continue
+            if section.required:
+                raise ValueError(
+                    f"Required prompt section {section.name!r} does not fit the "
+                    f"{budget}-token budget"
+                )
+            dropped.append(section.name)
+
+        text = self.separator.join(chosen[i] for i in sorted(chosen))
+        return BuiltPrompt(
+            text=text,
+            tokens=used,
+            budget=budget,
+            included=[sections[i].name for i in sorted(chosen)],
+            truncated=truncated,
+            dropped=dropped,
+            sections={sections[i].name: chosen[i] for i in sorted(chosen)},
+        )
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Record/replay LLM backend for deterministic benchmarking.
+
+Record real prompt -> completion pairs (with latency) once, then replay
+them without a GPU:
+
+    LLM_PROVIDER=record LLM_RECORD_FILE=run.jsonl.gz python examples/example_team.py
+    LLM_PROVIDER=replay LLM_REPLAY_FILE=run.jsonl.gz LLM_REPLAY_SPEED=0 python ...
+
+LLM_REPLAY_SPEED=1 replays at recorded speed, 2 at twice the speed, and 0
+(the default) returns instantly.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+from collections import deque
+import gzip
+import hashlib
+import json
+import threading
+import time
+
+
+def prompt_key(prompt: str) -> str:
+    """Short, stable key for a prompt."""
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def _open(path: str, mode: str):
+    """Open a recording, gzip-compressed when the name ends in .gz."""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class _RecordingFile:
+    """Append-only JSONL writer shared by all recorders of one file."""
+
+    _files: Dict[str, "_RecordingFile"] = {}
+    _files_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = _open(path, "a")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, path: str) -> "_RecordingFile":
+        with cls._files_lock:
+            if path not in cls._files:
+                cls._files[path] = cls(path)
+            return cls._files[path]
+
+    def write(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+
+
+class RecordingLLM:
+    """Wrap a real backend and record every prompt -> completion pair."""
+
+    def __init__(
+        self,
+        llm,
+        path: str = "llm_recording.jsonl",
+        model: Optional[str] = None,
+        store_prompts: bool = False,
+    ):
+        """
+        Initialize a recorder.
+
+        Args:
+            llm: Backend with invoke(prompt) or generate(prompt)
+            path: Recording file (.jsonl, or .jsonl.gz for compression)
+            model: Model name stored with each record
+            store_prompts: Keep full prompts in the file (for debugging);
+                by default only a hash is stored
+        """
+        self.llm = llm
+        self.path = path
+        self.model = model
+        self.store_prompts = store_prompts
+        self._file = _RecordingFile.get(path)
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        """Call the wrapped backend and record the exchange."""
+        started = time.perf_counter()
+        if hasattr(self.llm, "invoke"):
+            completion = self.llm.invoke(prompt, **kwargs)
+        else:
+            completion = self.llm.generate(prompt, **kwargs)
+        record = {
+            "key": prompt_key(prompt),
+            "model": self.model,
+            "completion": completion,
+            "latency": round(time.perf_counter() - started, 4),
+        }
+        if self.store_prompts:
+            record["prompt"] = prompt
+        self._file.write(record)
+        return completion
+
+
+class ReplayLLM:
+    """
+    Serve recorded completions.
+
+    Prompts are matched by hash; repeated prompts replay their recordings in
+    order (the last one is reused once exhausted). Unknown prompts get the
+    next recording in file order unless ``strict`` is set, so a recording
+    still drives a run whose prompts changed slightly.
+    """
+
+    def __init__(self, path: str, speed: float = 0.0, strict: bool = False):
+        """
+        Load a recording.
+
+        Args:
+            path: Recording file written by RecordingLLM
+            speed: 0 = instant, 1 = recorded latency, N = N times faster
+            strict: Raise LookupError for prompts that were not recorded
+        """
+        self.path = path
+        self.speed = speed
+        self.strict = strict
+        with _open(path, "r") as fh:
+            self.records: List[Dict[str, Any]] = [json.loads(line) for line in fh if line.strip()]
+        if not self.records:
+            raise ValueError(f"Recording {path} is empty")
+        self._by_key: Dict[str, deque] = {}
+        for i, record in enumerate(self.records):
+            self._by_key.setdefault(record["key"], deque()).append(i)
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _next(self, prompt: str) -> Dict[str, Any]:
+        with self._lock:
+            indexes = self._by_key.get(prompt_key(prompt))
+            if indexes:
+                self.hits += 1
+                i = indexes.popleft() if len(indexes) > 1 else indexes[0]
+            else:
+                self.misses += 1
+                if self.strict:
+                    raise LookupError(f"Prompt not in recording {self.path}")
+                i = self._cursor % len(self.records)
+                self._cursor += 1
+        return self.records[i]
+
+    def _delay(self, record: Dict[str, Any]) -> float:
+        return record.get("latency", 0.0) / self.speed if self.speed > 0 else 0.0
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        """Return the recorded completion for prompt."""
+        record = self._next(prompt)
+        delay = self._delay(record)
+        if delay:
+            time.sleep(delay)
+        return record["completion"]
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        """LMStudioClient-compatible alias of invoke."""
+        return self.invoke(prompt)
+
+    def stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Yield the recorded completion in ~4-character chunks, spread over its latency."""
+        record = self._next(prompt)
+        text = record["completion"]
+        chunks = [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+        delay = self._delay(record) / len(chunks)
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+
+_replays: Dict[tuple, ReplayLLM] = {}
+_replays_lock = threading.Lock()
+
+
+def get_replay_llm(path: str, speed: float = 0.0, strict: bool = False) -> ReplayLLM:
+    """Shared ReplayLLM per file, so all agents of a run consume one recording."""
+    with _replays_lock:
+        key = (path, speed, strict)
+        if key not in _replays:
+            _replays[key] = ReplayLLM(path, speed=speed, strict=strict)
+        return _replays[key]
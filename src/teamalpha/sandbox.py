@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Process-isolated tool execution.
+
+Runs tool functions in a pool of warm worker processes so that a hung
+subprocess, runaway loop or huge allocation in one tool cannot block or
+take down the agent (and, through Team.execute_task, the whole team).
+Workers are reused across calls; a worker is only replaced after it is
+killed for a timeout or cancellation, or after it crashes.
+
+Tool functions and their arguments/results must be picklable, i.e. tools
+must be module-level functions rather than lambdas or closures.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import Future
+import multiprocessing
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+class SandboxError(RuntimeError):
+    """A sandboxed tool call failed."""
+
+
+class ToolTimeoutError(SandboxError):
+    """A sandboxed tool call exceeded its wall-clock timeout."""
+
+
+class ToolCrashedError(SandboxError):
+    """The worker process died while running a tool."""
+
+
+class ToolCancelledError(SandboxError):
+    """A sandboxed tool call was cancelled."""
+
+
+def _set_cpu_limit(cpu_limit_s: int):
+    """Allow the worker cpu_limit_s more seconds of CPU from now."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + cpu_limit_s
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(conn, memory_limit_mb: Optional[int], cpu_limit_s: Optional[int]):
+    """Worker loop: receive (func, kwargs), send back ("ok"|"error", value)."""
+    if resource is not None and memory_limit_mb:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        except Exception as e:
+            # Unpickling failed, e.g. the tool's module cannot be imported.
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+            continue
+        if job is None:
+            return
+
+        func, kwargs = job
+        if resource is not None and cpu_limit_s:
+            # RLIMIT_CPU counts the whole process lifetime; re-arm it per call.
+            _set_cpu_limit(cpu_limit_s)
+        try:
+            reply = ("ok", func(**kwargs))
+        except BaseException as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        try:
+            conn.send(reply)
+        except Exception as e:
+            conn.send(("error", f"Tool result is not picklable: {e}"))
+
+
+class _Worker:
+    """A worker process and the parent's end of its pipe."""
+
+    def __init__(self, ctx, memory_limit_mb: Optional[int], cpu_limit_s: Optional[int]):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, memory_limit_mb, cpu_limit_s),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def kill(self):
+        """Terminate the worker immediately."""
+        self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=1)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class SandboxCall:
+    """Handle for a call submitted with ToolSandbox.submit."""
+
+    def __init__(self):
+        self._cancel = threading.Event()
+        self._future: Future = Future()
+
+    def cancel(self):
+        """Kill the running call; result() then raises ToolCancelledError."""
+        self._cancel.set()
+
+    def done(self) -> bool:
+        """Whether the call has finished (successfully or not)."""
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Wait for and return the tool result."""
+        return self._future.result(timeout=timeout)
+
+
+class ToolSandbox:
+    """Pool of warm worker processes for running tools in isolation."""
+
+    # How often a running call checks for cancellation.
+    poll_interval = 0.05
+
+    def __init__(
+        self,
+        workers: int = 2,
+        timeout: Optional[float] = 30.0,
+        memory_limit_mb: Optional[int] = None,
+        cpu_limit_s: Optional[int] = None,
+        start_method: str = "spawn",
+    ):
+        """
+        Initialize a sandbox.
+
+        Args:
+            workers: Maximum number of worker processes
+            timeout: Default wall-clock timeout per call in seconds
+            memory_limit_mb: Address-space limit per worker (RLIMIT_AS)
+            cpu_limit_s: CPU seconds allowed per call (RLIMIT_CPU)
+            start_method: multiprocessing start method for workers
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_limit_s = cpu_limit_s
+        self._ctx = multiprocessing.get_context(start_method)
+        self._idle: List[_Worker] = []
+        self._count = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._ctx, self.memory_limit_mb, self.cpu_limit_s)
+
+    def start(self) -> "ToolSandbox":
+        """Spawn all workers up front so the first calls find them warm."""
+        with self._cond:
+            missing = self.workers - self._count
+            self._count += missing
+        self._release_all([self._spawn() for _ in range(missing)])
+        return self
+
+    def _release_all(self, workers: List[_Worker]):
+        with self._cond:
+            self._idle.extend(workers)
+            self._cond.notify_all()
+
+    def _acquire(self) -> _Worker:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise SandboxError("Sandbox is shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if self._count < self.workers:
+                    self._count += 1
+                    break
+                self._cond.wait()
+        try:
+            return self._spawn()
+        except Exception:
+            with self._cond:
+                self._count -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool = True):
+        with self._cond:
+            if healthy and not self._closed:
+                self._idle.append(worker)
+            else:
+                self._count -= 1
+            self._cond.notify()
+        if not healthy:
+            worker.kill()
+        elif self._closed:
+            worker.stop()
+
+    def run(
+        self,
+        func: Callable,
+        kwargs: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Any:
+        """
+        Run func(**kwargs) in a worker and return its result.
+
+        Args:
+            func: Module-level callable
+            kwargs: Keyword arguments for func
+            timeout: Wall-clock timeout (defaults to the sandbox timeout)
+            cancel_event: Set it to kill the call from another thread
+
+        Returns:
+            The function's return value
+
+        Raises:
+            ToolTimeoutError, ToolCancelledError, ToolCrashedError, or
+            SandboxError carrying the exception raised by the tool
+        """
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._acquire()
+        try:
+            worker.conn.send((func, kwargs or {}))
+        except Exception as e:
+            self._release(worker)
+            raise TypeError(
+                f"Cannot send {getattr(func, '__name__', func)!r} to a sandbox "
+                f"worker (tools must be picklable, module-level functions): {e}"
+            )
+
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            wait = None
+            if deadline is not None:
+                wait = max(0.0, deadline - time.monotonic())
+            if cancel_event is not None:
+                wait = self.poll_interval if wait is None else min(wait, self.poll_interval)
+
+            if worker.conn.poll(wait):
+                try:
+                    status, value = worker.conn.recv()
+                except (EOFError, OSError):
+                    worker.process.join(timeout=1)
+                    code = worker.process.exitcode
+                    self._release(worker, healthy=False)
+                    raise ToolCrashedError(f"Tool worker died (exit code {code})")
+                self._release(worker)
+                if status == "ok":
+                    return value
+                raise SandboxError(value)
+
+            if cancel_event is not None and cancel_event.is_set():
+                self._release(worker, healthy=False)
+                raise ToolCancelledError("Tool call cancelled")
+            if deadline is not None and time.monotonic() >= deadline:
+                self._release(worker, healthy=False)
+                raise ToolTimeoutError(f"Tool call timed out after {timeout}s")
+
+    def submit(
+        self,
+        func: Callable,
+        kwargs: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> SandboxCall:
+        """Start a call in the background and return a cancellable handle."""
+        call = SandboxCall()
+
+        def dispatch():
+            try:
+                call._future.set_result(self.run(func, kwargs, timeout, call._cancel))
+            except BaseException as e:
+                call._future.set_exception(e)
+
+        threading.Thread(target=dispatch, daemon=True).start()
+        return call
+
+    def shutdown(self):
+        """Stop idle workers; busy ones are stopped when their call ends."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._count -= len(idle)
+            self._cond.notify_all()
+        for worker in idle:
+            worker.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
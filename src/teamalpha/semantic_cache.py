@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Semantic response cache.
+
+Near-duplicate prompts (same analysis with a new timestamp, a reordered
+JSON blob) miss an exact-match cache. This cache embeds each prompt and
+serves the stored completion of the most similar earlier prompt when the
+cosine similarity reaches ``threshold``:
+
+    cache = SemanticCache(EmbeddingsClient(url, cache=VectorCache("emb")))
+    agent = Agent("Alice", AgentRole.ENGINEER, semantic_cache=cache, temperature=0.0)
+    ...
+    print(cache.stats())   # hits, hit rate, seconds saved
+
+Guardrails: entries are partitioned per model and temperature, so a hit
+never crosses models or sampling settings, and calls sampled above
+``max_temperature`` (or at an unknown temperature) bypass the cache
+entirely. If embedding fails, the call runs uncached.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+import hashlib
+import threading
+import time
+
+from . import tracing
+from .embeddings import VectorIndex
+
+
+@dataclass
+class _Partition:
+    """Cached prompts of one (model, temperature) pair."""
+
+    index: VectorIndex = field(default_factory=VectorIndex)
+    completions: List[str] = field(default_factory=list)
+    latencies: List[float] = field(default_factory=list)
+    exact: Dict[str, int] = field(default_factory=dict)
+
+
+class SemanticCache:
+    """Embedding-similarity cache of LLM completions."""
+
+    def __init__(
+        self,
+        embedder,
+        threshold: float = 0.95,
+        max_temperature: float = 0.5,
+        max_entries: int = 2000,
+        normalize: Optional[Callable[[str], str]] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embedder: Object with embed_one(text) (e.g. EmbeddingsClient)
+                or a function text -> vector
+            threshold: Minimum cosine similarity for a hit
+            max_temperature: Calls with a higher (or unknown, None)
+                temperature are not cached
+            max_entries: Entries per partition; the oldest half is dropped
+                when full
+            normalize: Optional prompt rewrite applied before embedding,
+                e.g. stripping timestamps
+        """
+        self.embed = getattr(embedder, "embed_one", embedder)
+        self.threshold = threshold
+        self.max_temperature = max_temperature
+        self.max_entries = max_entries
+        self.normalize = normalize
+        self._partitions: Dict[Tuple[str, Any], _Partition] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.errors = 0  # lookups or stores abandoned because embedding failed
+        self.time_saved = 0.0  # seconds of generation avoided, net of lookups
+        self.overhead = 0.0  # seconds spent embedding and searching
+
+    def _cacheable(self, temperature: Optional[float]) -> bool:
+        return temperature is not None and temperature <= self.max_temperature
+
+    def _prepare(self, prompt: str) -> Tuple[str, str]:
+        text = self.normalize(prompt) if self.normalize else prompt
+        return text, hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    def lookup(
+        self, prompt: str, model: str, temperature: Optional[float] = None
+    ) -> Tuple[Optional[str], Optional[List[float]]]:
+        """
+        Find a cached completion for a similar prompt.
+
+        Returns:
+            (completion or None, the prompt's embedding for a later store;
+            None when the exact-match path answered or the call is not
+            cacheable)
+        """
+        if not self._cacheable(temperature):
+            with self._lock:
+                self.bypassed += 1
+            return None, None
+
+        started = time.perf_counter()
+        text, digest = self._prepare(prompt)
+        key = (model, temperature)
+        with tracing.span("cache.semantic_lookup", model=model) as span:
+            with self._lock:
+                partition = self._partitions.get(key)
+                row = partition.exact.get(digest) if partition else None
+                if row is not None:
+                    # Identical prompt: no need to embed.
+                    return self._hit(partition, row, started, span, 1.0), None
+
+            vector = self.embed(text)
+            with self._lock:
+                partition = self._partitions.get(key)
+                matches = partition.index.search(vector, top_k=1) if partition else []
+                if matches and matches[0][1] >= self.threshold:
+                    return self._hit(partition, matches[0][0], started, span, matches[0][1]), None
+                self.misses += 1
+                self.overhead += time.perf_counter() - started
+                span.set(hit=False)
+        return None, vector
+
+    def _hit(self, partition: _Partition, row: int, started: float, span, similarity: float) -> str:
+        elapsed = time.perf_counter() - started
+        self.hits += 1
+        self.overhead += elapsed
+        self.time_saved += max(0.0, partition.latencies[row] - elapsed)
+        span.set(hit=True, similarity=similarity)
+        return partition.completions[row]
+
+    def store(
+        self,
+        prompt: str,
+        completion: str,
+        model: str,
+        temperature: Optional[float] = None,
+        latency: float = 0.0,
+        vector: Optional[List[float]] = None,
+    ):
+        """
+        Add a completion to the cache.
+
+        Args:
+            latency: Seconds the completion took, credited on later hits
+            vector: Prompt embedding from lookup(), to avoid embedding twice
+        """
+        if not self._cacheable(temperature):
+            return
+        text, digest = self._prepare(prompt)
+        if vector is None:
+            vector = self.embed(text)
+        key = (model, temperature)
+        with self._lock:
+            partition = self._partitions.setdefault(key, _Partition())
+            if len(partition.completions) >= self.max_entries:
+                partition = self._shrink(key, partition)
+            row = len(partition.completions)
+            partition.index.add([row], [vector])
+            partition.completions.append(completion)
+            partition.latencies.append(latency)
+            partition.exact[digest] = row
+
+    def _shrink(self, key: Tuple[str, Any], partition: _Partition) -> _Partition:
+        """Keep the newest half of a full partition."""
+        keep = len(partition.completions) // 2
+        start = len(partition.completions) - keep
+        vectors = partition.index.vectors()[start:]
+        fresh = _Partition()
+        fresh.index.add(list(range(keep)), vectors)
+        fresh.completions = partition.completions[start:]
+        fresh.latencies = partition.latencies[start:]
+        fresh.exact = {d: r - start for d, r in partition.exact.items() if r >= start}
+        self._partitions[key] = fresh
+        return fresh
+
+    def cached_call(
+        self,
+        prompt: str,
+        call: Callable[[], str],
+        model: str,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """
+        Return a cached completion for prompt, or run call() and cache it.
+
+        The cache never makes the call fail: if the embedder raises, call()
+        runs uncached.
+        """
+        try:
+            completion, vector = self.lookup(prompt, model, temperature)
+        except Exception as e:
+            self._embed_failed(e)
+            return call()
+        if completion is not None:
+            return completion
+        started = time.perf_counter()
+        completion = call()
+        try:
+            self.store(
+                prompt, completion, model, temperature,
+                latency=time.perf_counter() - started, vector=vector,
+            )
+        except Exception as e:
+            self._embed_failed(e)
+        return completion
+
+    def _embed_failed(self, error: Exception):
+        with self._lock:
+            self.errors += 1
+        print(f"⚠️  Semantic cache skipped: {error}")
+
+    def clear(self):
+        """Drop all entries (statistics are kept)."""
+        with self._lock:
+            self._partitions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts, hit rate and time saved."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "time_saved_s": round(self.time_saved, 3),
+            "overhead_s": round(self.overhead, 3),
+            "entries": sum(len(p.completions) for p in self._partitions.values()),
+        }
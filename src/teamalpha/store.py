@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""Persistent team state: tasks, results and messages, for checkpoint/resume."""
+
+from typing import Any, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+
+
+class StateStore(ABC):
+    """
+    Interface for team state persistence.
+
+    Records are plain dicts (Task.to_dict() / Message.to_dict() plus a
+    sequence number for messages) so stores do not depend on Team.
+    """
+
+    @abstractmethod
+    def start_run(self, run_id: str, team_name: str):
+        """Register a run (no-op if it already exists)."""
+
+    @abstractmethod
+    def save_task(self, run_id: str, task: Dict[str, Any]):
+        """Insert or update a task."""
+
+    @abstractmethod
+    def save_message(self, run_id: str, seq: int, message: Dict[str, Any]):
+        """Append a message to the run's log."""
+
+    @abstractmethod
+    def load_tasks(self, run_id: str) -> List[Dict[str, Any]]:
+        """Load all tasks of a run."""
+
+    @abstractmethod
+    def load_messages(self, run_id: str) -> List[Dict[str, Any]]:
+        """Load a run's message log in order."""
+
+    @abstractmethod
+    def count_messages(self, run_id: str) -> int:
+        """Number of stored messages of a run."""
+
+    def flush(self):
+        """Make all pending writes durable."""
+
+    def close(self):
+        """Flush and release resources."""
+        self.flush()
+
+
+class SQLiteStateStore(StateStore):
+    """
+    SQLite-backed state store.
+
+    Writes are buffered and committed in batched transactions, either when
+    ``batch_size`` records are pending or ``flush_interval`` seconds have
+    passed since the last commit. Team flushes explicitly whenever a task
+    completes, so finished LLM work is never only in the buffer.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY,
+        team TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS tasks (
+        run_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        description TEXT NOT NULL,
+        assigned_to TEXT,
+        status TEXT NOT NULL,
+        result TEXT,
+        created_at REAL,
+        completed_at REAL,
+        PRIMARY KEY (run_id, id)
+    );
+    CREATE TABLE IF NOT EXISTS messages (
+        run_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        sender TEXT NOT NULL,
+        role TEXT NOT NULL,
+        content TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        PRIMARY KEY (run_id, seq)
+    );
+    """
+
+    TASK_COLUMNS = (
+        "id", "description", "assigned_to", "status",
+        "result", "created_at", "completed_at",
+    )
+
+    def __init__(
+        self,
+        path: str = "teamalpha_state.db",
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+    ):
+        """
+        Open (or create) a state database.
+
+        Args:
+            path: SQLite database file
+            batch_size: Pending records that trigger a commit
+            flush_interval: Max seconds between commits while writing
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+        self._tasks: Dict[Tuple[str, str], Tuple] = {}
+        self._messages: List[Tuple] = []
+        self._last_flush = time.monotonic()
+
+    def start_run(self, run_id: str, team_name: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, team, created_at) VALUES (?, ?, ?)",
+                (run_id, team_name, time.time()),
+            )
+            self._conn.commit()
+
+    def save_task(self, run_id: str, task: Dict[str, Any]):
+        row = (run_id,) + tuple(task.get(c) for c in self.TASK_COLUMNS)
+        with self._lock:
+            # Only the latest state of a task needs writing.
+            self._tasks[(run_id, task["id"])] = row
+        self._maybe_flush()
+
+    def save_message(self, run_id: str, seq: int, message: Dict[str, Any]):
+        row = (
+            run_id, seq, message["sender"], message["role"],
+            message["content"], message["timestamp"],
+        )
+        with self._lock:
+            self._messages.append(row)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        pending = len(self._tasks) + len(self._messages)
+        if (
+            pending >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            tasks, self._tasks = list(self._tasks.values()), {}
+            messages, self._messages = self._messages, []
+            self._last_flush = time.monotonic()
+            if not tasks and not messages:
+                return
+            with self._conn:
+                if tasks:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO tasks (run_id, "
+                        + ", ".join(self.TASK_COLUMNS)
+                        + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        tasks,
+                    )
+                if messages:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO messages "
+                        "(run_id, seq, sender, role, content, timestamp) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        messages,
+                    )
+
+    def load_tasks(self, run_id: str) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT " + ", ".join(self.TASK_COLUMNS)
+                + " FROM tasks WHERE run_id = ? ORDER BY created_at",
+                (run_id,),
+            ).fetchall()
+        return [dict(zip(self.TASK_COLUMNS, row)) for row in rows]
+
+    def load_messages(self, run_id: str) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT sender, role, content, timestamp FROM messages "
+                "WHERE run_id = ? ORDER BY seq",
+                (run_id,),
+            ).fetchall()
+        return [
+            {"sender": s, "role": r, "content": c, "timestamp": t}
+            for s, r, c, t in rows
+        ]
+
+    def count_messages(self, run_id: str) -> int:
+        self.flush()
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM messages WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return count
+
+    def list_runs(self, team_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List stored runs, newest first."""
+        query = "SELECT run_id, team, created_at FROM runs"
+        params: Tuple = ()
+        if team_name is not None:
+            query += " WHERE team = ?"
+            params = (team_name,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created_at DESC", params).fetchall()
+        return [{"run_id": r, "team": t, "created_at": c} for r, t, c in rows]
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
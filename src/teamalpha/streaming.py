@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Incremental tool-call parsing for streamed LLM output.
+
+The parsers consume text chunks as they arrive and hand back each tool call
+as soon as it is syntactically complete, so a tool can start while the
+model is still generating the rest of its answer.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from concurrent.futures import Future
+import json
+import re
+
+_TOOL_HEADER = re.compile(r"\[TOOL:\s*(\w+)\s*,\s*ARGS:\s*")
+_TOOL_START = "[TOOL:"
+
+
+def _scan_json_object(text: str, start: int) -> int:
+    """
+    Find the end of the JSON object starting at text[start] == "{".
+
+    Returns:
+        Index just past the closing brace, or -1 if the object is not
+        complete yet
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return -1
+
+
+class ToolCallStreamParser:
+    """
+    Incremental parser for ``[TOOL: name, ARGS: {...}]`` calls.
+
+    Unlike a single regex, the argument object is matched by brace depth
+    (string-aware), so nested JSON works. Calls whose arguments are not
+    valid JSON are skipped, as in Agent.parse_tool_calls.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0  # everything before pos has been consumed
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Add a chunk of model output.
+
+        Returns:
+            Calls completed by this chunk, in order
+        """
+        self.buffer += chunk
+        calls = []
+        while True:
+            start = self.buffer.find(_TOOL_START, self.pos)
+            if start < 0:
+                # Keep a tail that may be the beginning of "[TOOL:".
+                self.pos = max(self.pos, len(self.buffer) - len(_TOOL_START) + 1)
+                break
+            header = _TOOL_HEADER.match(self.buffer, start)
+            if header is None:
+                if self._header_may_continue(start):
+                    self.pos = start
+                    break
+                self.pos = start + 1
+                continue
+            brace = header.end()
+            if brace >= len(self.buffer):
+                self.pos = start
+                break
+            if self.buffer[brace] != "{":
+                self.pos = start + 1
+                continue
+            end = _scan_json_object(self.buffer, brace)
+            if end < 0:
+                self.pos = start
+                break
+            close = end
+            while close < len(self.buffer) and self.buffer[close].isspace():
+                close += 1
+            if close >= len(self.buffer):
+                self.pos = start
+                break
+            self.pos = end
+            if self.buffer[close] != "]":
+                continue
+            self.pos = close + 1
+            try:
+                args = json.loads(self.buffer[brace:end])
+            except json.JSONDecodeError:
+                continue
+            if isinstance(args, dict):
+                calls.append({"tool": header.group(1), "args": args})
+
+        # Drop consumed text so long generations stay cheap to scan.
+        if self.pos > 4096:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        return calls
+
+    def _header_may_continue(self, start: int) -> bool:
+        """Whether text from start could still become a valid header."""
+        tail = self.buffer[start:]
+        return bool(re.fullmatch(r"\[TOOL:\s*(\w+\s*(,\s*(A(R(G(S(:\s*)?)?)?)?)?)?)?", tail))
+
+
+def parse_tool_calls(text: str) -> List[Dict[str, Any]]:
+    """Parse all complete ``[TOOL: ...]`` calls in a finished response."""
+    return ToolCallStreamParser().feed(text)
+
+
+class FunctionCallStreamParser:
+    """
+    Incremental parser for the ``tool_name("arg1", "arg2")`` syntax used by
+    tools/mcp_executor_agent.py. Only names in ``tool_names`` are reported.
+    """
+
+    _CALL = re.compile(r'(\w+)\(\s*"([^"]*)"\s*(?:,\s*"([^"]*)")?\s*\)')
+    _OPEN = re.compile(r"\w+\(")
+
+    def __init__(self, tool_names: Iterable[str]):
+        self.tool_names = set(tool_names)
+        self.buffer = ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Add a chunk of model output.
+
+        Returns:
+            Completed calls as {"tool": name, "args": [arg1(, arg2)]}
+        """
+        self.buffer += chunk
+        calls = []
+        consumed = 0
+        for match in self._CALL.finditer(self.buffer):
+            consumed = match.end()
+            name, arg1, arg2 = match.groups()
+            if name in self.tool_names:
+                calls.append({"tool": name, "args": [arg1, arg2] if arg2 else [arg1]})
+
+        # Keep only text from the first call that might still be completed.
+        pending = self._OPEN.search(self.buffer, consumed)
+        if pending is not None:
+            self.buffer = self.buffer[pending.start():]
+        else:
+            # A name may still be growing at the end of the buffer.
+            word = re.search(r"\w*$", self.buffer)
+            self.buffer = self.buffer[word.start():]
+        return calls
+
+
+def dispatch_streaming(
+    chunks: Iterable[str],
+    parser,
+    submit: Callable[[Dict[str, Any]], Optional[Future]],
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Consume a token stream, starting tools as their calls complete.
+
+    Args:
+        chunks: Text chunks from the backend
+        parser: ToolCallStreamParser or FunctionCallStreamParser
+        submit: Called with each completed call; may return a Future,
+            which is stored on the call under "future"
+
+    Returns:
+        (full response text, calls in the order they appeared)
+    """
+    parts = []
+    calls: List[Dict[str, Any]] = []
+    for chunk in chunks:
+        parts.append(chunk)
+        for call in parser.feed(chunk):
+            future = submit(call)
+            if future is not None:
+                call["future"] = future
+            calls.append(call)
+    return "".join(parts), calls
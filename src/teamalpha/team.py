@@ -3,9 +3,13 @@
 
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass, field
+from src.teamalpha import tracing
 from src.teamalpha.agent import Agent, AgentRole, Message, Tool
+from src.teamalpha.prompt import truncate_to_tokens
+from src.teamalpha.store import StateStore
 import json
 import time
+import uuid
 
 
 @dataclass
@@ -36,18 +40,106 @@ class Task:
 class Team:
     """A team of collaborative agents."""
 
-    def __init__(self, name: str):
-        """Initialize a team."""
+    def __init__(
+        self,
+        name: str,
+        store: Optional[StateStore] = None,
+        run_id: Optional[str] = None,
+    ):
+        """
+        Initialize a team.
+
+        Args:
+            name: Team name
+            store: Optional state store; tasks, results and messages are
+                written to it as the run progresses
+            run_id: Id of this run in the store (generated if omitted); the
+                run is registered with the store on its first write, so a
+                team that resumes another run leaves no empty one behind
+        """
         self.name = name
         self.agents: Dict[str, Agent] = {}
         self.tasks: Dict[str, Task] = {}
-        self.message_log: List[Message] = []
+        self._message_log: Optional[List[Message]] = []
+        self._message_count = 0
         self.context = ""
+        self.store = store
+        self.run_id = run_id or f"{name}-{time.strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._run_started = False
+
+    @property
+    def message_log(self) -> List[Message]:
+        """All broadcast messages (loaded from the store on first use after resume)."""
+        if self._message_log is None:
+            self._message_log = [
+                Message(
+                    sender=m["sender"],
+                    role=AgentRole(m["role"]),
+                    content=m["content"],
+                    timestamp=m["timestamp"],
+                )
+                for m in self.store.load_messages(self.run_id)
+            ]
+        return self._message_log
 
     def add_agent(self, agent: Agent):
         """Add an agent to the team."""
         self.agents[agent.name] = agent
         agent.context = f"Team: {self.name}"
+        if self._message_log is None:
+            agent.set_memory_loader(self._history_loader())
+
+    def _start_run(self):
+        if not self._run_started:
+            self.store.start_run(self.run_id, self.name)
+            self._run_started = True
+
+    def _save_task(self, task: "Task"):
+        if self.store is not None:
+            self._start_run()
+            self.store.save_task(self.run_id, task.to_dict())
+
+    def checkpoint(self):
+        """Flush pending state to the store."""
+        if self.store is not None:
+            with tracing.span("team.checkpoint"):
+                self.store.flush()
+
+    def resume(self, run_id: str) -> "Team":
+        """
+        Continue a stored run.
+
+        Tasks are restored (completed ones keep their results and are
+        skipped by execute_task; interrupted ones go back to assigned).
+        The message log and agent memories are only read from the store
+        when first needed.
+
+        Args:
+            run_id: Run to resume
+
+        Returns:
+            self
+        """
+        if self.store is None:
+            raise ValueError("Cannot resume without a state store")
+        self.run_id = run_id
+        self._run_started = False
+        self.tasks = {}
+        for data in self.store.load_tasks(run_id):
+            task = Task(**data)
+            if task.status == "in_progress":
+                task.status = "assigned" if task.assigned_to else "pending"
+            self.tasks[task.id] = task
+        self._message_log = None
+        self._message_count = self.store.count_messages(run_id)
+        for agent in self.agents.values():
+            agent.set_memory_loader(self._history_loader())
+        return self
+
+    def _history_loader(self):
+        """Loader for the messages stored so far; later ones arrive by broadcast."""
+        count = self._message_count
+        return lambda: self.message_log[:count]
 
     def get_agent_by_role(self, role: AgentRole) -> Optional[Agent]:
         """Get first agent with a given role."""
@@ -58,14 +150,21 @@ class Team:
 
     def broadcast_message(self, message: Message):
         """Broadcast a message to all team members."""
-        self.message_log.append(message)
-        for agent in self.agents.values():
-            agent.add_memory(message)
+        if self._message_log is not None:
+            self._message_log.append(message)
+        if self.store is not None:
+            self._start_run()
+            self.store.save_message(self.run_id, self._message_count, message.to_dict())
+        self._message_count += 1
+        with tracing.span("team.broadcast", sender=message.sender, recipients=len(self.agents)):
+            for agent in self.agents.values():
+                agent.add_memory(message)
 
     def create_task(self, task_id: str, description: str) -> Task:
         """Create a new task."""
         task = Task(id=task_id, description=description)
         self.tasks[task_id] = task
+        self._save_task(task)
         return task
 
     def assign_task(self, task_id: str, agent_name: str):
@@ -78,6 +177,7 @@ class Team:
         task = self.tasks[task_id]
         task.assigned_to = agent_name
         task.status = "assigned"
+        self._save_task(task)
 
         # Notify team
         msg = Message(
@@ -96,30 +196,41 @@ class Team:
         if not task.assigned_to:
             raise ValueError(f"Task {task_id} not assigned")
 
-        agent = self.agents[task.assigned_to]
-        task.status = "in_progress"
+        if task.status == "completed":
+            # Already done (e.g. in a resumed run); don't pay for it twice.
+            return task
 
-        # Notify team
-        msg = Message(
-            sender="SYSTEM",
-            role=AgentRole.PM,
-            content=f"Executing task {task_id} with {agent.name}",
-        )
-        self.broadcast_message(msg)
-
-        # Execute
-        result = agent.execute(task.description)
-        task.result = result
-        task.status = "completed"
-        task.completed_at = time.time()
-
-        # Notify team
-        msg = Message(
-            sender=agent.name,
-            role=agent.role,
-            content=f"Completed task {task_id}. Result: {result[:500]}...",
-        )
-        self.broadcast_message(msg)
+        agent = self.agents[task.assigned_to]
+        with tracing.span("team.execute_task", task_id=task_id, agent=agent.name):
+            task.status = "in_progress"
+            self._save_task(task)
+
+            # Notify team
+            msg = Message(
+                sender="SYSTEM",
+                role=AgentRole.PM,
+                content=f"Executing task {task_id} with {agent.name}",
+            )
+            self.broadcast_message(msg)
+
+            # Execute
+            result = agent.execute(task.description)
+            task.result = result
+            task.status = "completed"
+            task.completed_at = time.time()
+            self._save_task(task)
+
+            # Notify team
+            msg = Message(
+                sender=agent.name,
+                role=agent.role,
+                content=(
+                    f"Completed task {task_id}. "
+                    f"Result: {truncate_to_tokens(result, 128, agent.prompt_builder.tokenizer)}"
+                ),
+            )
+            self.broadcast_message(msg)
+            self.checkpoint()
 
         return task
 
@@ -132,7 +243,7 @@ class Team:
                 for a in self.agents.values()
             ],
             "tasks": [t.to_dict() for t in self.tasks.values()],
-            "messages": len(self.message_log),
+            "messages": self._message_count,
         }
 
     def __repr__(self) -> str:
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Memoizing result cache for agent tools."""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import json
+import subprocess
+import threading
+import time
+
+# put() without a version: compute the invalidation key at store time
+_CURRENT = object()
+
+
+def canonical_args(kwargs: Dict[str, Any]) -> str:
+    """Serialize tool arguments so equal arguments give equal keys."""
+    return json.dumps(kwargs, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def git_head_key(arg: str = "path") -> Callable[[Dict[str, Any]], Optional[str]]:
+    """
+    Build an invalidation key function tied to a repository's HEAD.
+
+    Cached results for a repo are discarded as soon as a new commit lands.
+
+    Args:
+        arg: Name of the tool argument holding the repository path
+    """
+
+    def key(kwargs: Dict[str, Any]) -> Optional[str]:
+        path = kwargs.get(arg)
+        if not path:
+            return None
+        try:
+            result = subprocess.run(
+                ["git", "-C", str(path), "rev-parse", "HEAD"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+            return result.stdout.strip() or None
+        except Exception:
+            return None
+
+    return key
+
+
+class ToolResultCache:
+    """
+    LRU cache of tool results with optional TTL and invalidation key.
+
+    Entries are keyed by tool name plus canonical JSON of the arguments.
+    When an ``invalidation_key`` function is given, its value (e.g. the
+    repo's HEAD commit) is stored with each entry and a lookup whose current
+    value differs is treated as a miss. Callers that run the tool between
+    lookup and store should pass the version lookup() returned to put(), so
+    a result computed from the old state is never filed under a new one.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        invalidation_key: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries before LRU eviction
+            ttl: Seconds an entry stays valid (None = no expiry)
+            invalidation_key: Function of the call arguments returning a
+                version token; entries from another version are stale
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.invalidation_key = invalidation_key
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, tool_name: str, kwargs: Dict[str, Any]) -> str:
+        return f"{tool_name}:{canonical_args(kwargs)}"
+
+    def get(self, tool_name: str, kwargs: Dict[str, Any]) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+
+        Returns:
+            (hit, result); result is None on a miss
+        """
+        hit, result, _ = self.lookup(tool_name, kwargs)
+        return hit, result
+
+    def lookup(self, tool_name: str, kwargs: Dict[str, Any]) -> Tuple[bool, Any, Any]:
+        """
+        Look up a cached result and capture the current version.
+
+        Returns:
+            (hit, result, version); result is None on a miss, and version is
+            the invalidation key as of this lookup, for put()
+        """
+        key = self._key(tool_name, kwargs)
+        version = self.invalidation_key(kwargs) if self.invalidation_key else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                result, expires_at, entry_version = entry
+                if (expires_at is None or expires_at > time.monotonic()) and (
+                    entry_version == version
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, result, version
+                del self._entries[key]
+            self.misses += 1
+            return False, None, version
+
+    def put(
+        self,
+        tool_name: str,
+        kwargs: Dict[str, Any],
+        result: Any,
+        version: Any = _CURRENT,
+    ):
+        """
+        Store a result, evicting the least recently used entry if full.
+
+        Args:
+            version: Invalidation key captured by lookup() before the tool
+                ran (default: computed now)
+        """
+        key = self._key(tool_name, kwargs)
+        if version is _CURRENT:
+            version = self.invalidation_key(kwargs) if self.invalidation_key else None
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (result, expires_at, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tool_name: Optional[str] = None):
+        """Drop all entries, or only those of one tool."""
+        with self._lock:
+            if tool_name is None:
+                self._entries.clear()
+                return
+            prefix = f"{tool_name}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Lightweight tracing spans for Team -> Agent -> LLM -> Tool calls.
+
+    from src.teamalpha import tracing
+
+    tracing.enable()
+    team.execute_task("task-1")
+    tracing.export("trace.json")                   # Chrome trace / Perfetto
+    tracing.export("spans.json", format="json")    # flat span list
+
+Setting TEAMALPHA_TRACE=trace.json enables tracing at import and exports
+when the process exits.
+
+Spans nest through a context variable, so each thread (and each tool call
+submitted with ``bind``) gets the right parent. While tracing is disabled,
+``span()`` returns a shared no-op object; the no-op is falsy, so callers
+can skip computing expensive attributes with ``if span: span.set(...)``.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+from contextvars import ContextVar, copy_context
+import atexit
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+_current: ContextVar[Optional["Span"]] = ContextVar("teamalpha_span", default=None)
+_enabled = False
+_spans: List["Span"] = []
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_epoch = time.perf_counter()
+
+
+class Span:
+    """A named, timed interval with attributes and a parent span."""
+
+    __slots__ = ("name", "attrs", "span_id", "parent_id", "thread", "start", "end", "_token")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], start: Optional[float] = None):
+        parent = _current.get()
+        self.name = name
+        self.attrs = attrs
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.thread = threading.get_ident()
+        self.start = time.perf_counter() if start is None else start
+        self.end: Optional[float] = None
+        self._token = None
+
+    def set(self, **attrs) -> "Span":
+        """Add or update attributes."""
+        self.attrs.update(attrs)
+        return self
+
+    def finish(self, end: Optional[float] = None):
+        """Close the span and hand it to the collector."""
+        self.end = time.perf_counter() if end is None else end
+        with _lock:
+            _spans.append(self)
+
+    @property
+    def duration(self) -> float:
+        """Seconds between start and end (0 while open)."""
+        return (self.end - self.start) if self.end is not None else 0.0
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _current.reset(self._token)
+        self.finish()
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "thread": self.thread,
+            "start_ms": (self.start - _epoch) * 1000,
+            "duration_ms": self.duration * 1000,
+            "attrs": self.attrs,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned by span() while tracing is disabled."""
+
+    __slots__ = ()
+
+    def set(self, **attrs) -> "_NoopSpan":
+        return self
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **attrs):
+    """Open a span as a context manager (no-op while tracing is disabled)."""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attrs)
+
+
+def record(name: str, start: float, end: Optional[float] = None, **attrs):
+    """
+    Record an interval that was timed by hand, e.g. inside a generator
+    where a context-managed span would leak into the consumer's context.
+
+    Args:
+        name: Span name
+        start: time.perf_counter() at the start
+        end: time.perf_counter() at the end (defaults to now)
+    """
+    if _enabled:
+        Span(name, attrs, start=start).finish(end)
+
+
+def bind(func: Callable) -> Callable:
+    """
+    Carry the current span into another thread.
+
+    Call at submission time, once per submission, e.g.
+    ``pool.submit(tracing.bind(tool.invoke), **args)``.
+    """
+    if not _enabled:
+        return func
+    return functools.partial(copy_context().run, func)
+
+
+def enabled() -> bool:
+    """Whether spans are being collected."""
+    return _enabled
+
+
+def enable():
+    """Start collecting spans."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop collecting spans (collected spans are kept)."""
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    """Drop collected spans."""
+    with _lock:
+        _spans.clear()
+
+
+def spans() -> List[Span]:
+    """Finished spans in completion order."""
+    with _lock:
+        return list(_spans)
+
+
+def summary() -> Dict[str, Dict[str, float]]:
+    """Count and total/max milliseconds per span name."""
+    totals: Dict[str, Dict[str, float]] = {}
+    for s in spans():
+        entry = totals.setdefault(s.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += s.duration * 1000
+        entry["max_ms"] = max(entry["max_ms"], s.duration * 1000)
+    return totals
+
+
+def to_chrome_trace() -> Dict[str, Any]:
+    """Spans as Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev)."""
+    pid = os.getpid()
+    events = [
+        {
+            "name": s.name,
+            "cat": s.name.split(".", 1)[0],
+            "ph": "X",
+            "ts": (s.start - _epoch) * 1e6,
+            "dur": s.duration * 1e6,
+            "pid": pid,
+            "tid": s.thread,
+            "args": dict(s.attrs, span_id=s.span_id, parent_id=s.parent_id),
+        }
+        for s in spans()
+    ]
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export(path: str, format: str = "chrome"):
+    """
+    Write collected spans to a file.
+
+    Args:
+        path: Output file
+        format: "chrome" for trace-event JSON, "json" for a flat span list
+    """
+    if format == "chrome":
+        data = to_chrome_trace()
+    elif format == "json":
+        data = {"spans": [s.to_dict() for s in spans()], "summary": summary()}
+    else:
+        raise ValueError(f"Unknown trace format: {format}")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, default=str)
+
+
+_trace_path = os.getenv("TEAMALPHA_TRACE")
+if _trace_path:
+    enable()
+    atexit.register(export, _trace_path, os.getenv("TEAMALPHA_TRACE_FORMAT", "chrome"))
@@ -0,0 +1,34 @@
+"""Shared pytest setup: make ``src.teamalpha`` and ``tools`` importable."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def fake_server():
+    """Base URL of an in-process fake LM Studio/Ollama backend."""
+    from tools.fake_llm_server import LatencyModel, make_server
+
+    server = make_server("127.0.0.1", 0, LatencyModel(ttft=0.0, tps=0.0, tokens=16))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def make_agent(fake_server, monkeypatch):
+    """Build Agents talking to the fake server through LMStudioClient."""
+    from src.teamalpha.agent import Agent, AgentRole
+
+    monkeypatch.delenv("LLM_PROVIDER", raising=False)
+    monkeypatch.delenv("LLM_CONFIG_FILE", raising=False)
+
+    def make(name="Tess", role=AgentRole.ENGINEER, **kwargs):
+        return Agent(name, role, provider="lmstudio", lmstudio_host=fake_server, **kwargs)
+
+    return make
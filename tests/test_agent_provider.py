@@ -0,0 +1,42 @@
+"""Provider selection: explicit arguments, config file and environment."""
+
+import json
+
+import pytest
+
+from src.teamalpha import llm_config
+from src.teamalpha.agent import Agent, AgentRole
+from src.teamalpha.lmstudio import LMStudioClient
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("LLM_PROVIDER", raising=False)
+    monkeypatch.setattr(llm_config, "_source", None)
+
+    def write(data):
+        path = tmp_path / "llm.json"
+        path.write_text(json.dumps(data))
+        monkeypatch.setenv("LLM_CONFIG_FILE", str(path))
+        return path
+
+    return write
+
+
+def test_explicit_provider_beats_config_file(config_file, fake_server):
+    config_file({"provider": "ollama"})
+    agent = Agent("Tess", AgentRole.ENGINEER, provider="lmstudio", lmstudio_host=fake_server)
+    assert isinstance(agent.llm, LMStudioClient)
+
+
+def test_unsupported_configured_provider_is_ignored(config_file, fake_server, capsys):
+    config_file({"provider": "custom", "custom": {"base_url": "http://x", "model": "m"}})
+    agent = Agent("Tess", AgentRole.ENGINEER, provider="auto", lmstudio_host=fake_server)
+    assert isinstance(agent.llm, LMStudioClient)
+    assert "Ignoring unsupported LLM provider 'custom'" in capsys.readouterr().out
+
+
+def test_unknown_explicit_provider_is_rejected(config_file):
+    config_file({})
+    with pytest.raises(ValueError, match="Unknown provider"):
+        Agent("Tess", AgentRole.ENGINEER, provider="custom")
@@ -0,0 +1,61 @@
+"""The agent's temperature reaches every LM Studio request."""
+
+import pytest
+
+from src.teamalpha.agent import Tool
+
+
+@pytest.fixture
+def payloads(monkeypatch):
+    """Record the JSON body of every request an agent's client sends."""
+    sent = []
+
+    def record(agent):
+        post = agent.llm.session.post
+
+        def recording_post(url, *args, **kwargs):
+            sent.append((url.rsplit("/v1/", 1)[-1], kwargs.get("json")))
+            return post(url, *args, **kwargs)
+
+        monkeypatch.setattr(agent.llm.session, "post", recording_post)
+        return sent
+
+    return record
+
+
+def ls(path: str) -> str:
+    return "README.md"
+
+
+def test_native_tools_path_sends_temperature(make_agent, payloads):
+    agent = make_agent(temperature=0.1)
+    agent.add_tool(Tool("ls", "List files", ls))
+    sent = payloads(agent)
+
+    agent.think_with_tools("List the files")
+
+    assert [path for path, _ in sent] == ["chat/completions"]
+    assert sent[0][1]["tools"]
+    assert sent[0][1]["temperature"] == 0.1
+
+
+def test_streaming_path_sends_temperature(make_agent, payloads):
+    agent = make_agent(temperature=0.2, native_tools=False, stream_tools=True)
+    agent.add_tool(Tool("ls", "List files", ls, parallel_safe=True))
+    sent = payloads(agent)
+
+    agent.think_with_tools("List the files")
+
+    assert [path for path, _ in sent] == ["completions"]
+    assert sent[0][1]["stream"] is True
+    assert sent[0][1]["temperature"] == 0.2
+
+
+def test_default_temperature_is_left_to_the_client(make_agent, payloads):
+    agent = make_agent()
+    sent = payloads(agent)
+
+    agent.think("Say hi")
+
+    assert sent[0][1]["temperature"] == 0.7
+    assert agent.sampling_temperature() is None
@@ -0,0 +1,47 @@
+"""Tool execution: timeouts and error observations."""
+
+import json
+import threading
+import time
+
+from src.teamalpha.agent import Tool
+
+
+def test_hung_tool_does_not_starve_later_calls(make_agent):
+    release = threading.Event()
+    agent = make_agent(max_tool_workers=1)
+    agent.add_tool(Tool("hang", "Never returns", lambda: release.wait(), timeout=0.1))
+    agent.add_tool(Tool("ping", "Quick", lambda: "pong", timeout=1.0))
+    try:
+        [(_, hung)] = agent.run_tool_calls([{"tool": "hang", "args": {}}])
+        assert "timed out" in json.loads(hung)["error"]
+
+        started = time.monotonic()
+        [(_, ping)] = agent.run_tool_calls([{"tool": "ping", "args": {}}])
+        assert json.loads(ping)["result"] == "pong"
+        assert time.monotonic() - started < 0.5
+    finally:
+        release.set()
+        agent.close()
+
+
+def test_close_shuts_down_the_pool(make_agent):
+    with make_agent() as agent:
+        agent.add_tool(Tool("ping", "Quick", lambda: "pong", parallel_safe=True, timeout=1.0))
+        agent.run_tool_calls([{"tool": "ping", "args": {}}])
+        pool = agent._tool_pool
+    assert agent._tool_pool is None
+    assert pool._shutdown
+
+
+def test_unknown_tool_gets_an_error_observation(make_agent):
+    agent = make_agent()
+    agent.add_tool(Tool("ping", "Quick", lambda: "pong"))
+    results = agent.run_tool_calls(
+        [{"tool": "pnig", "args": {}}, {"tool": "ping", "args": {}}]
+    )
+    assert [name for name, _ in results] == ["pnig", "ping"]
+    error = json.loads(results[0][1])
+    assert not error["success"]
+    assert "Unknown tool 'pnig'" in error["error"] and "available: ping" in error["error"]
+    assert json.loads(results[1][1])["result"] == "pong"
@@ -0,0 +1,31 @@
+"""Cascade escalation from the agent's model to a larger one."""
+
+from src.teamalpha.cascade import CascadePolicy
+
+
+class BigModel:
+    """Escalation LLM stub that records what the agent looked like mid-call."""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.agent_llm_during_call = None
+
+    def generate(self, prompt, **kwargs):
+        self.agent_llm_during_call = self.agent.llm
+        return "A long and confident answer from the larger model."
+
+
+def test_escalation_does_not_swap_the_agent_llm(make_agent, monkeypatch):
+    agent = make_agent(
+        cascade_model="big", cascade_policy=CascadePolicy(min_chars=10**6), chat_mode=False
+    )
+    small = agent.llm
+    big = BigModel(agent)
+    monkeypatch.setattr(agent, "_get_escalation_llm", lambda target: big)
+
+    response = agent.think("Explain the design")
+
+    assert response == "A long and confident answer from the larger model."
+    assert agent.last_escalation == "short"
+    assert big.agent_llm_during_call is small
+    assert agent.llm is small
@@ -0,0 +1,45 @@
+"""Tests for the persistent VectorCache."""
+
+from array import array
+
+from src.teamalpha.embeddings import VectorCache
+
+
+def test_reload_round_trip(tmp_path):
+    path = str(tmp_path / "cache")
+    VectorCache(path).put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+
+    cache = VectorCache(path)
+    assert len(cache) == 2
+    assert cache.get("b") == [3.0, 4.0]
+
+
+def test_torn_write_then_put_and_reload(tmp_path):
+    path = str(tmp_path / "cache")
+    VectorCache(path).put_many(["a"], [[1.0, 2.0]])
+    # Crash after the vector append but before the key append.
+    with open(f"{path}.f32", "ab") as fh:
+        fh.write(array("f", [9.0, 9.0]).tobytes())
+
+    cache = VectorCache(path)
+    assert len(cache) == 1
+    cache.put_many(["b"], [[5.0, 6.0]])
+
+    reloaded = VectorCache(path)
+    assert reloaded.get("a") == [1.0, 2.0]
+    assert reloaded.get("b") == [5.0, 6.0]
+
+
+def test_torn_key_line_is_discarded(tmp_path):
+    path = str(tmp_path / "cache")
+    VectorCache(path).put_many(["a"], [[1.0, 2.0]])
+    # Crash in the middle of writing the next key (no vector, no newline).
+    with open(f"{path}.keys", "a", encoding="ascii") as fh:
+        fh.write("partial")
+
+    cache = VectorCache(path)
+    cache.put_many(["b"], [[5.0, 6.0]])
+
+    reloaded = VectorCache(path)
+    assert "partial" not in reloaded
+    assert reloaded.get("b") == [5.0, 6.0]
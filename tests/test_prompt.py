@@ -0,0 +1,42 @@
+"""Tests for token-budgeted prompt assembly."""
+
+from src.teamalpha.prompt import PromptBuilder, PromptSection, truncate_to_tokens
+
+
+def test_truncate_keep_tail_keeps_the_end():
+    text = "old " * 50 + "NEWEST"
+    cut = truncate_to_tokens(text, 10, keep_tail=True)
+    assert cut.startswith("...")
+    assert cut.endswith("NEWEST")
+
+
+def test_keep_tail_section_loses_its_start():
+    builder = PromptBuilder(context_window=40, reserve_tokens=0)
+    built = builder.build([
+        PromptSection("task", "Task: x", required=True),
+        PromptSection("log", "step 1 " * 40 + "step 2 result", keep_tail=True),
+    ])
+    assert built.truncated == ["log"]
+    assert built.sections["log"].endswith("step 2 result")
+
+
+def test_agent_scratchpad_keeps_latest_observation(make_agent):
+    agent = make_agent(context_window=1500)
+    scratchpad = (
+        "\n[Step 1]\n[TOOL: read, ARGS: {}]\nObservation: " + "first " * 600
+        + "\n[Step 2]\n[TOOL: read, ARGS: {}]\nObservation: LATEST RESULT\n"
+    )
+    built = agent.build_prompt("Summarize the repo", scratchpad)
+    assert built.truncated == ["scratchpad"]
+    assert "LATEST RESULT" in built.text
+    assert "when done" in built.sections["task"]
+
+
+def test_memory_summary_cuts_messages_by_tokens(make_agent):
+    from src.teamalpha.agent import AgentRole, Message
+
+    agent = make_agent(tokenizer=str.split)
+    agent.add_memory(Message("Bob", AgentRole.ENGINEER, "word " * 100))
+    content = agent.get_memory_summary().split(": ", 1)[1]
+    assert content.endswith("...")
+    assert len(content.split()) <= 50
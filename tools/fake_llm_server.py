@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Fake LLM backend for offline load testing.
+
+Speaks enough of the Ollama, OpenAI/LM Studio and TeamAlpha proxy HTTP
+APIs for server.py, TeamAlphaClient and LMStudioClient to run against it,
+with a latency model instead of a GPU:
+
+    time to first token  --ttft seconds (+/- --jitter)
+    generation speed     --tps tokens per second
+    failures             --error-rate fraction of requests answered with 500
+    capacity             --concurrency requests generating at once; extra
+                         requests queue (or get 503 with --reject-when-busy)
+
+Endpoints:
+    GET  /health, /api/tags, /api/ps, /api/version, /v1/models,
+         /api/v0/models, /stats
+    POST /api/generate, /api/chat              (Ollama, NDJSON streaming)
+    POST /v1/completions, /v1/chat/completions (OpenAI, SSE streaming)
+    POST /v1/embeddings
+    POST /generate                             (TeamAlpha proxy)
+
+Usage:
+    python tools/fake_llm_server.py --port 11434 --ttft 0.2 --tps 40
+    OLLAMA_HOST=http://localhost:11434 uvicorn server:app --port 8080
+    python benchmarks/load_test.py --url http://localhost:8080 --target proxy
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+import argparse
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+
+WORDS = (
+    "the agent reviews the repository and reports that the build is stable "
+    "while the deployment pipeline needs a second look at caching"
+).split()
+
+
+@dataclass
+class LatencyModel:
+    """Timing and failure behaviour of the fake backend."""
+
+    ttft: float = 0.2
+    tps: float = 40.0
+    tokens: int = 64
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    concurrency: int = 4
+    reject_when_busy: bool = False
+    seed: Optional[int] = None
+    embedding_dim: int = 64
+
+
+class FakeBackend:
+    """Shared state: latency model, concurrency slots and counters."""
+
+    def __init__(self, model: LatencyModel):
+        self.model = model
+        self.slots = threading.BoundedSemaphore(model.concurrency)
+        self.random = random.Random(model.seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rejected": 0, "active": 0, "tokens": 0}
+
+    def count(self, key: str, delta: int = 1):
+        with self.lock:
+            self.stats[key] += delta
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.model.error_rate
+
+    def ttft(self) -> float:
+        with self.lock:
+            spread = self.model.ttft * self.model.jitter
+            return max(0.0, self.model.ttft + self.random.uniform(-spread, spread))
+
+    def tokens(self, max_tokens: Optional[int]) -> Iterator[str]:
+        """Yield tokens at the configured rate, after the first-token delay."""
+        n = self.model.tokens if not max_tokens else min(self.model.tokens, max_tokens)
+        time.sleep(self.ttft())
+        delay = 1.0 / self.model.tps if self.model.tps > 0 else 0.0
+        for i in range(n):
+            if i and delay:
+                time.sleep(delay)
+            self.count("tokens")
+            yield (" " if i else "") + WORDS[i % len(WORDS)]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    backend: FakeBackend = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out as separate writes; without this, Nagle's
+        # algorithm holds the body until the client's delayed ACK (~40 ms).
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client dropped a kept-alive connection (e.g. a cancelled stream).
+            pass
+
+    # -- responses -----------------------------------------------------
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data: str):
+        raw = data.encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(raw), raw))
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    # -- routing -------------------------------------------------------
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-fake"})
+        elif path == "/api/tags":
+            self._send_json(200, {"models": [{"name": "llama3", "model": "llama3"}]})
+        elif path == "/api/ps":
+            self._send_json(200, {"models": [{"name": "llama3", "model": "llama3", "context_length": 8192}]})
+        elif path == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "openai/gpt-oss-20b", "object": "model"}]})
+        elif path == "/api/v0/models":
+            self._send_json(200, {"object": "list", "data": [{
+                "id": "openai/gpt-oss-20b", "object": "model", "type": "llm", "state": "loaded",
+                "max_context_length": 131072, "capabilities": ["tool_use"],
+            }]})
+        elif path == "/stats":
+            with self.backend.lock:
+                self._send_json(200, dict(self.backend.stats))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        routes = {
+            "/api/generate": self._ollama,
+            "/api/chat": self._ollama,
+            "/v1/completions": self._openai,
+            "/v1/chat/completions": self._openai,
+            "/v1/embeddings": self._embeddings,
+            "/generate": self._proxy,
+        }
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid JSON"})
+            return
+        if path not in routes:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        backend = self.backend
+        backend.count("requests")
+        if not backend.slots.acquire(blocking=not backend.model.reject_when_busy):
+            backend.count("rejected")
+            self._send_json(503, {"error": "server busy"})
+            return
+        backend.count("active")
+        try:
+            if backend.should_fail():
+                backend.count("errors")
+                self._send_json(500, {"error": "simulated backend failure"})
+                return
+            routes[path](path, body)
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away (e.g. a cancelled request); stop generating.
+            self.close_connection = True
+        finally:
+            backend.count("active", -1)
+            backend.slots.release()
+
+    # -- APIs ----------------------------------------------------------
+
+    def _ollama(self, path: str, body: Dict[str, Any]):
+        chat = path == "/api/chat"
+        model = body.get("model", "llama3")
+        max_tokens = (body.get("options") or {}).get("num_predict")
+        started = time.perf_counter()
+
+        def piece(text: str, done: bool) -> Dict[str, Any]:
+            out = {"model": model, "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ"), "done": done}
+            if chat:
+                out["message"] = {"role": "assistant", "content": text}
+            else:
+                out["response"] = text
+            return out
+
+        if not body.get("stream", True):
+            text = "".join(self.backend.tokens(max_tokens))
+            final = piece(text, True)
+            final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+            self._send_json(200, final)
+            return
+
+        self._start_stream("application/x-ndjson")
+        count = 0
+        for token in self.backend.tokens(max_tokens):
+            count += 1
+            self._write_chunk(json.dumps(piece(token, False)) + "\n")
+        final = piece("", True)
+        final["eval_count"] = count
+        final["total_duration"] = int((time.perf_counter() - started) * 1e9)
+        self._write_chunk(json.dumps(final) + "\n")
+        self._end_stream()
+
+    def _openai(self, path: str, body: Dict[str, Any]):
+        chat = path.endswith("chat/completions")
+        model = body.get("model", "openai/gpt-oss-20b")
+        request_id = f"fake-{time.monotonic_ns()}"
+
+        def choice(text: str, finish: Optional[str], stream: bool, index: int = 0) -> Dict[str, Any]:
+            if not chat:
+                return {"index": index, "text": text, "finish_reason": finish}
+            key = "delta" if stream else "message"
+            return {"index": index, key: {"role": "assistant", "content": text}, "finish_reason": finish}
+
+        if not body.get("stream"):
+            # n alternatives are decoded as one batch: same latency as one.
+            tokens = list(self.backend.tokens(body.get("max_tokens")))
+            n = max(1, int(body.get("n") or 1))
+            if chat:
+                prompt = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+            else:
+                prompt = str(body.get("prompt", ""))
+            self._send_json(200, {
+                "id": request_id,
+                "object": "chat.completion" if chat else "text_completion",
+                "model": model,
+                "choices": [choice("".join(tokens), "stop", False, i) for i in range(n)],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4,
+                    "completion_tokens": len(tokens) * n,
+                    "total_tokens": len(prompt) // 4 + len(tokens) * n,
+                },
+            })
+            return
+
+        self._start_stream("text/event-stream")
+        for token in self.backend.tokens(body.get("max_tokens")):
+            event = {"id": request_id, "model": model, "choices": [choice(token, None, True)]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+        event = {"id": request_id, "model": model, "choices": [choice("", "stop", True)]}
+        self._write_chunk(f"data: {json.dumps(event)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self._end_stream()
+
+    def _embeddings(self, path: str, body: Dict[str, Any]):
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        time.sleep(self.backend.ttft())
+        data = []
+        for i, text in enumerate(inputs):
+            # Deterministic pseudo-embedding: equal texts, equal vectors.
+            rng = random.Random(hashlib.sha1(str(text).encode()).digest())
+            vector = [rng.uniform(-1, 1) for _ in range(self.backend.model.embedding_dim)]
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        self._send_json(200, {"object": "list", "model": body.get("model"), "data": data})
+
+    def _proxy(self, path: str, body: Dict[str, Any]):
+        if not body.get("prompt"):
+            self._send_json(400, {"detail": "prompt is required"})
+            return
+        self._send_json(200, {"text": "".join(self.backend.tokens(body.get("max_tokens")))})
+
+
+def make_server(host: str, port: int, model: LatencyModel) -> ThreadingHTTPServer:
+    """Create (but do not start) a fake backend server."""
+    handler = type("FakeHandler", (Handler,), {"backend": FakeBackend(model)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Ollama/OpenAI backend for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Seconds to first token")
+    parser.add_argument("--tps", type=float, default=40.0, help="Tokens per second per request")
+    parser.add_argument("--tokens", type=int, default=64, help="Tokens per response (capped by max_tokens)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Relative TTFT jitter, e.g. 0.2 = +/-20%%")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests generating at once")
+    parser.add_argument("--reject-when-busy", action="store_true", help="Answer 503 instead of queueing")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    model = LatencyModel(
+        ttft=args.ttft,
+        tps=args.tps,
+        tokens=args.tokens,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        concurrency=args.concurrency,
+        reject_when_busy=args.reject_when_busy,
+        seed=args.seed,
+    )
+    server = make_server(args.host, args.port, model)
+    print(f"🧪 Fake LLM backend on http://{args.host}:{args.port} ({model})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
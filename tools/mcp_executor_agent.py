@@ -5,9 +5,15 @@ This agent can actually execute tools when instructed by the LLM.
 """
 import json
 import os
-import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from langchain_ollama import OllamaLLM
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.teamalpha.streaming import FunctionCallStreamParser, dispatch_streaming
+
 
 class GitHubMCPClient:
     """Wrapper around MCP GitHub server."""
@@ -116,22 +122,7 @@ class ToolExecutor:
     def extract_tool_calls(self, text: str) -> list:
         """Extract tool calls from LLM response text."""
         # Look for patterns like: tool_name("arg1", "arg2")
-        pattern = r'(\w+)\(\s*"([^"]*)"\s*(?:,\s*"([^"]*)")?\s*\)'
-        matches = re.findall(pattern, text)
-        
-        tool_calls = []
-        for match in matches:
-            tool_name = match[0]
-            arg1 = match[1]
-            arg2 = match[2] if match[2] else None
-            
-            if tool_name in self.tools:
-                tool_calls.append({
-                    "tool": tool_name,
-                    "args": [arg1, arg2] if arg2 else [arg1]
-                })
-        
-        return tool_calls
+        return FunctionCallStreamParser(self.tools).feed(text)
     
     def execute_tool(self, tool_name: str, args: list) -> str:
         """Execute a specific tool."""
@@ -161,6 +152,25 @@ class ToolExecutor:
         
         return results
 
+    def execute_streaming(self, chunks) -> tuple:
+        """
+        Execute tool calls while the LLM response is still streaming.
+
+        Each call starts as soon as its closing parenthesis arrives.
+
+        Returns:
+            (full response text, [(tool_name, result), ...] in call order;
+            repeated calls to the same tool each keep their own result)
+        """
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            response, calls = dispatch_streaming(
+                chunks,
+                FunctionCallStreamParser(self.tools),
+                lambda call: pool.submit(self.execute_tool, call["tool"], call["args"]),
+            )
+            results = [(call["tool"], call["future"].result()) for call in calls]
+        return response, results
+
 
 class MCPExecutorAgent:
     """Agent that can execute MCP tools."""
@@ -199,18 +209,17 @@ I will execute these tools and show you the results."""
         for iteration in range(max_iterations):
             print(f"🔄 Iteration {iteration + 1}/{max_iterations}\n")
             
-            # Get LLM response
+            # Stream the LLM response; tools start as soon as each call is complete
             prompt = f"{query}\n\nPlease respond and use tools if needed."
-            response = self.llm.invoke(prompt)
+            response, tool_results = self.executor.execute_streaming(
+                self.llm.stream(prompt)
+            )
             print(f"Agent: {response}\n")
             
-            # Extract and execute tools
-            tool_results = self.executor.execute_all(response)
-            
             if tool_results:
                 print("-" * 80)
                 print("🔧 Tool Results:\n")
-                for tool_name, result in tool_results.items():
+                for tool_name, result in tool_results:
                     print(f"{tool_name}:")
                     print(f"{result}\n")
                 print("-" * 80 + "\n")